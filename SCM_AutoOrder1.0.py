@@ -1,15 +1,22 @@
 # Product_AutoOrder_Individual_Supplier_v1.0.py
 import streamlit as st
 import pandas as pd
-import numpy as np
-import json
-import os
 import math
 import datetime
-from typing import Dict, Optional
 from pathlib import Path
-from io import BytesIO
-import plotly.express as px
+
+from scm_autoorder.charts import urgent_order_figure
+from scm_autoorder.constants import (CHANGE_TYPES, COL_BARCODE, COL_ITEM_CODE, COL_ITEM_NAME, COL_SALES, COL_SPEC,
+                                     COL_STOCK, COL_UNIT_PRICE, DIFF_DISPLAY_MAX_ROWS, DIFF_STYLE_MAX_ROWS,
+                                     FILE_PATTERN, ORDER_DISPLAY_COLUMNS, ORDER_EXCEL_COLUMNS,
+                                     OVERSTOCK_DISPLAY_COLUMNS)
+from scm_autoorder.engine import build_result_views, calculate_order_quantity, filter_items
+from scm_autoorder.export import to_excel_bytes
+from scm_autoorder.help import load_help_text
+from scm_autoorder.history import diff_runs, format_run_label, list_run_ids, load_run, load_run_index, save_run
+from scm_autoorder.ingest import (compute_input_hash, find_latest_file, list_suppliers, missing_required_columns,
+                                  read_sales_file)
+from scm_autoorder.settings import default_settings, parse_settings_df
 
 # --- 1. 기본 설정 및 스타일 (변경 없음) ---
 st.set_page_config(page_title="LPI TEAM 자동 납품량 계산 시스템", layout="wide")
@@ -22,327 +29,68 @@ st.markdown("""
 st.markdown('<div class="footer">by suhyuk (twodoong@gmail.com)</div>', unsafe_allow_html=True)
 
 
-# --- 2. 설정 및 상수 정의 (변경 없음) ---
-SETTINGS_FILE = 'item_settings.json'
-FILE_PATTERN = "현황*.xlsx"
-COL_ITEM_CODE = '상품코드'
-COL_ITEM_NAME = '상품명'
-COL_SPEC = '규격'
-COL_BARCODE = '바코드'
-COL_UNIT_PRICE = '현구매단가'
-COL_SUPPLIER = '매입처'
-COL_SALES = '매출수량'
-COL_STOCK = '현재고'
-EXCLUDE_KEYWORDS = ['배송비', '첫 주문', '쿠폰', '개인결제', '마일리지']
-INITIAL_DEFAULT_SETTINGS = {'lead_time': 15, 'safety_stock_rate': 10, 'addition_rate': 0, 'order_unit': 5, 'min_sales': 0}
-
-# --- 3. 핵심 기능 함수 (변경 없음) ---
-def load_settings() -> Dict[str, Dict]:
-    # 이 함수는 session_state 초기화 로직 변경으로 인해 직접 호출되지는 않게 됩니다.
-    if os.path.exists(SETTINGS_FILE):
-        with open(SETTINGS_FILE, 'r', encoding='utf-8') as f:
-            settings = json.load(f)
-            if "master_defaults" not in settings:
-                settings["master_defaults"] = INITIAL_DEFAULT_SETTINGS.copy()
-            else:
-                if "min_sales" not in settings["master_defaults"]:
-                     settings["master_defaults"]['min_sales'] = INITIAL_DEFAULT_SETTINGS['min_sales']
-
-            for sup_settings in settings.get("defaults", {}).values():
-                sup_settings.setdefault('min_sales', settings["master_defaults"]['min_sales'])
-            for item_settings in settings.get("overrides", {}).values():
-                item_settings.setdefault('min_sales', INITIAL_DEFAULT_SETTINGS['min_sales'])
-            return settings
-    return {"master_defaults": INITIAL_DEFAULT_SETTINGS.copy(), "defaults": {}, "overrides": {}}
-
-def save_settings(settings: Dict[str, Dict]):
-    # Streamlit 클라우드 환경의 읽기 전용 파일 시스템 문제로 이 함수는 호출되지 않도록 수정합니다.
-    with open(SETTINGS_FILE, 'w', encoding='utf-8') as f:
-        json.dump(settings, f, ensure_ascii=False, indent=4)
-
-def find_latest_file(directory: Path, pattern: str) -> Optional[Path]:
-    try:
-        files = list(directory.glob(pattern))
-        if not files: return None
-        return max(files, key=lambda p: p.stat().st_mtime)
-    except Exception: return None
-
-def get_min_sales_for_row(row: pd.Series, settings: Dict[str, Dict]) -> int:
-    item_code = str(row.get(COL_ITEM_CODE, ''))
-    supplier = str(row.get(COL_SUPPLIER, ''))
-    master_defaults = settings.get("master_defaults", INITIAL_DEFAULT_SETTINGS)
-
-    if item_code in settings.get("overrides", {}) and 'min_sales' in settings["overrides"][item_code]:
-        return settings["overrides"][item_code]['min_sales']
-    if supplier in settings.get("defaults", {}) and 'min_sales' in settings["defaults"][supplier]:
-        return settings["defaults"][supplier]['min_sales']
-    return master_defaults.get('min_sales', 0)
-
-def calculate_order_quantity(df: pd.DataFrame, settings: Dict[str, Dict], period_days: int) -> pd.DataFrame:
-    results = []
-    master_defaults = settings.get("master_defaults", INITIAL_DEFAULT_SETTINGS)
-    default_settings = settings.get("defaults", {})
-    override_settings = settings.get("overrides", {})
-
-    for row in df.to_dict('records'):
-        item_code = str(row.get(COL_ITEM_CODE, ''))
-        supplier = str(row.get(COL_SUPPLIER, ''))
-        final_settings = {k: v for k, v in {**master_defaults, **default_settings.get(supplier, {}), **override_settings.get(item_code, {})}.items() if k != 'min_sales'}
-
-        lead_time = final_settings.get('lead_time', 0)
-        safety_stock_rate = final_settings.get('safety_stock_rate', 0) / 100
-        addition_rate = final_settings.get('addition_rate', 0) / 100
-        order_unit = final_settings.get('order_unit', 1)
-        if order_unit <= 0: order_unit = 1
-
-        sales_quantity = row.get(COL_SALES, 0)
-        current_stock = row.get(COL_STOCK, 0)
-        row['추천 납품량'] = 0
-        row['초과재고 수량'] = 0
-
-        if period_days > 0:
-            avg_daily_sales = sales_quantity / period_days
-            sales_during_lead_time = avg_daily_sales * lead_time
-            safety_stock = sales_during_lead_time * safety_stock_rate
-            reorder_point = sales_during_lead_time + safety_stock
-            base_order_quantity = reorder_point - current_stock
-
-            if base_order_quantity <= 0:
-                if current_stock > reorder_point * 2 and reorder_point > 0:
-                    row['비고'] = "초과재고"
-                    row['초과재고 수량'] = current_stock - math.ceil(reorder_point)
-                else:
-                    row['비고'] = "재고 충분"
-            else:
-                calculated_quantity = base_order_quantity * (1 + addition_rate)
-                final_order_quantity = math.ceil(calculated_quantity / order_unit) * order_unit
-                row['추천 납품량'] = int(final_order_quantity)
-                if current_stock < final_order_quantity:
-                    row['비고'] = "납품 필요 (긴급)"
-                else:
-                    row['비고'] = "납품 필요"
-
-            row['재고 소진 예상일'] = current_stock / avg_daily_sales if avg_daily_sales > 0 else float('inf')
-        else:
-            row['비고'] = "기간 1일 이상"
-            row['재고 소진 예상일'] = float('inf')
-
-        row['적용된 설정'] = f"L:{lead_time} S:{safety_stock_rate*100:.0f}% A:{addition_rate*100:.0f}% U:{order_unit}"
-        results.append(row)
-    return pd.DataFrame(results)
+# --- 2. 계산 엔진 연결 ---
+# 계산, 파일 읽기, 엑셀 변환, 실행 이력은 scm_autoorder 패키지에 있으며, 이 스크립트는 위젯과 엔진만 연결합니다.
+@st.cache_data(max_entries=4, show_spinner=False)
+def load_sales_data(input_hash: str, _source) -> pd.DataFrame:
+    # 같은 현황 파일을 재실행마다 다시 읽지 않도록 파일 해시 기준으로 캐시합니다.
+    return read_sales_file(_source)
+
+@st.cache_data(max_entries=16, show_spinner=False)
+def load_run_cached(run_id: str) -> pd.DataFrame:
+    # 실행 결과 파일은 저장 후 변경되지 않으므로 run_id 기준으로 캐시합니다.
+    return load_run(run_id)
+
+@st.cache_data(max_entries=4, show_spinner=False)
+def load_run_index_cached(run_ids: tuple) -> pd.DataFrame:
+    # 저장된 실행 목록(파일 이름)이 그대로면 재실행마다 메타데이터 파일을 다시 읽지 않습니다.
+    return load_run_index(run_ids)
+
+@st.cache_data(max_entries=16, show_spinner=False)
+def cached_run_diff(prev_run_id: str, curr_run_id: str) -> pd.DataFrame:
+    # 슬라이더 등으로 인한 재실행 시 비교 결과를 다시 계산하지 않도록 실행 쌍 기준으로 캐시합니다.
+    return diff_runs(load_run_cached(prev_run_id), load_run_cached(curr_run_id))
+
+def set_result(result_df: pd.DataFrame):
+    # 화면용 표(납품 추천, 초과재고)와 엑셀 파일만 계산 시 한 번 만들어 세션에 보관하고, 이후 재실행에서는 그대로 사용합니다.
+    st.session_state.result_views = build_result_views(result_df) if not result_df.empty else None
+    st.session_state.order_excel = None
+    st.session_state.overstock_excel = None
+    if st.session_state.result_views is not None:
+        order_needed_df = st.session_state.result_views['order_needed']
+        overstock_df = st.session_state.result_views['overstock']
+        if not order_needed_df.empty:
+            st.session_state.order_excel = to_excel_bytes(order_needed_df[ORDER_EXCEL_COLUMNS], 'OrderList')
+        if not overstock_df.empty:
+            overstock_cols = [col for col in OVERSTOCK_DISPLAY_COLUMNS if col in overstock_df.columns]
+            st.session_state.overstock_excel = to_excel_bytes(overstock_df[overstock_cols], 'Overstock')
 
 def style_remarks(val):
     if val in ['납품 필요 (긴급)', '악성 초과재고']:
         return 'color: #D32F2F; font-weight: bold;'
     return ''
 
-# --- 4. Streamlit UI 구성 ---
+# --- 3. Streamlit UI 구성 ---
 title_col1, title_col2 = st.columns([3, 1])
 with title_col1:
     st.title("LPI TEAM 자동 납품량 계산 시스템 v1.0")
 
-# ### BUG FIX: st.dialog를 st.expander로 변경하여 버전 호환성 문제 해결 ###
+# ### BUG FIX: st.dialog 대신 버전 호환성이 있는 위젯 사용 ###
+# expander 본문은 닫혀 있어도 재실행마다 만들어져 전송되므로, 토글을 켰을 때만 도움말을 불러와 표시합니다.
 with title_col2:
-    with st.expander("📖 시스템 설명"):
-        st.markdown("""
-        ### 📂 1. 입력 항목 설명
-        • **시작일/종료일**: 매출 분석 기간 설정 (기본: 30일)  
-        • **제외 매출수량**: 입력값 미만 품목은 계산에서 제외  
-        • **리드타임(재발주 기간)(일)**: 납품 후 입고까지 소요 기간(재발주 기간)  
-        • **안전재고율(%)**: 리드타임(재발주 기간) 동안 예상 매출의 추가 보유 비율  
-        • **가산율(%)**: 계산된 납품량에 추가하는 여유분 비율  
-        • **납품단위**: 납품 시 최소 단위 (5개 단위 등)  
-        
-        ### 📊 2. 긴급 납품 품목 비율 설명
-        **■ 안전재고 적용 상세 조건:** • 계산식: (일일 평균 매출 수량 × 리드타임(재발주 기간)) × 안전재고율  
-        • 목적: 모자랄 것을 대비하는 추가 여유분  
-        • 예시: 일일 20개 판매, 리드타임(재발주 기간) 15일, 안전재고율 10%  
-        　→ 기본 추전 납품량 = 20 × 15 = 300개  
-        　→ 안전재고 = 300 × 0.1 = 30개 (추가 여유분)  
-        　→ 총 추전 납품량 = 300 + 30 = 330개  
-        
-        **■ 긴급 납품 조건:** • 현재고 < 최종 추천 납품량 (납품량이 클수록 긴급)  
-        • 예시: 현재고 250개 < 최종 추천 납품량 350개 → 긴급 납품  
-        
-        **■ 표시 비율 설정:** • 긴급 납품 품목 중 표시할 상위 비율  
-        • 정렬 기준: 추천 납품량이 많은 순서  
-        • 예시: 긴급 품목 20개 × 25% = 상위 5개 표시  
-        　　　긴급 품목 8개 × 50% = 상위 4개 표시  
-        
-        ### 🧮 3. 납품 추천 상품 계산 조건
-        **■ 계산 공식:** • 일일 평균 매출 수량수량 = 총 매출수량 ÷ 분석기간  
-        • 기본 추전 납품량 = 일일 평균 매출 수량 × 리드타임(재발주 기간)  
-        • 안전재고 = 기본 추전 납품량 × 안전재고율 (추가 여유분)  
-        • 총 추전 납품량 = 기본 추전 납품량 + 안전재고  
-        • 기본 납품량 = 총 추전 납품량 - 현재고  
-        • 최종 납품량 = 기본 납품량 × (1 + 가산율) → 납품단위로 반올림  
-        
-        **■ 계산 예시:** • 매출수량: 600개(30일), 현재고: 80개, 리드타임(재발주 기간): 15일, 안전재고율: 10%, 가산율: 5%, 납품단위: 10개  
-        • 일일 평균: 600÷30 = 20개  
-        • 기본 추전 납품량: 20×15 = 300개  
-        • 안전재고: 300×0.1 = 30개 (추가 여유분)  
-        • 총 추전 납품량: 300+30 = 330개  
-        • 기본 납품량: 330-80 = 250개  
-        • 최종 납품량: 250×1.05 = 262.5 → 270개(10개 단위)  
-        
-        **■ 비고(납품 표시) 판정 기준:** • 납품 필요 (긴급): 현재고 < 최종 추천 납품량  
-        • 납품 필요: 기본 납품량 > 0, 현재고 ≥ 최종 추천 납품량  
-        • 재고 충분: 기본 납품량 ≤ 0  
-        • 초과재고: 현재고 > 총 추전 납품량 × 2  
-        
-        ### ⚙️ 4. 개별 품목별 설정 설명
-        **■ 설정 우선순위:** 1. 개별 품목 설정 (최우선)  
-        2. 상품별 전체 기본값  
-        
-        **■ 사용법 예시:** • 특정 상품(A001)은 리드타임(재발주 기간)이 다른 상품보다 길어서 25일로 설정  
-        • 상품별 전체 기본값: 리드타임(재발주 기간) 15일 → 개별 설정: 리드타임(재발주 기간) 25일  
-        • 계산 시 A001만 25일 적용, 나머지는 15일 적용  
-        
-        **■ 실제 적용:** • 납품량 계산 실행 후 상품코드 검색  
-        • 개별 설정값 입력 후 저장  
-        • 재계산 시 개별 설정값 적용  
-        • 기본값 복원으로 개별 설정 삭제 가능  
-        
-        ### 📦 5. 초과재고 현황 계산 조건
-        **■ 초과재고 판정:** 현재고 > 총 추전 발주량 × 2  
-        
-        **■ 각 컬럼 계산 예시:** • 현재고: 800개, 총 추전 발주량: 330개, 매출수량: 600개(30일), 현구매단가: 1,000원  
-        • 초과재고 수량 = 800 - 330 = 470개  
-        • 초과재고 비율 = 800 ÷ 600 = 1.3배  
-        • 초과재고 금액 = 470 × 1,000 = 470,000원  
-        • 재고 소진 예상일 = 800 ÷ 20(일일매출) = 40일  
-        
-        **■ 악성/일반 구분:** • 전체 초과재고 비율의 중간값을 기준으로 분류  
-        • 예시: 중간값이 2.0배인 경우  
-        　→ 2.0배 이상: 악성 초과재고 (빨간색 표시)  
-        　→ 2.0배 미만: 일반 초과재고  
-        """)
-
-    with st.expander("📋 사용 메뉴얼"):
-        st.markdown("""
-        ### **LPI TEAM 자동 납품량 계산 시스템 - 사용자 메뉴얼 (v1.0)**
-
-        안녕하세요! LPI TEAM 자동 납품량 계산 시스템 사용을 환영합니다.
-        이 시스템은 매출현황 데이터와 매입처 제공 설정값을 기반으로 최적의 납품량을 자동 계산합니다.
-
-        ---
-
-        #### **1. 시작 전 준비사항: 필요한 파일들**
-
-        시스템 사용을 위해 **2개의 파일**이 필요합니다:
-
-        **▶ ① 매출현황 파일 (필수)**
-        • **파일명**: `현황`으로 시작하는 엑셀 파일 (예: `현황20250626_123028.xlsx`)
-        • **위치**: PC의 `다운로드` 폴더 (자동 검색됨)
-        • **필수 컬럼**: 상품코드, 상품명, 규격, 바코드, 매출수량, 현구매단가, 현재고, 매입처
-
-        **▶ ② 설정값 파일 (매입처 제공)**
-        • **파일명**: `하이온_품목별설정값_YYYYMMDD_HHMMSS.xlsx` 형식
-        • **제공처**: 매입처에서 제공받은 설정값 파일
-        • **내용**: 납품량 계산을 위한 리드타임, 안전재고율 등의 설정값
-
-        > **✅ 체크포인트**: 두 파일이 모두 준비되었나요? 그럼 시작해보세요!
-
-        ---
-
-        #### **2. 기본 사용 흐름: 3단계 완료!**
-
-        ##### **▶ 1단계: 매출현황 파일 확인**
-        1. **[1. 분석 대상 파일 및 기간 설정]** 섹션에서 파일 상태를 확인합니다
-        2. **자동 검색**: "✅ 자동으로 찾은 최신 파일" 메시지 확인
-        3. **수동 업로드**: 파일이 검색되지 않으면 '수동으로 파일 업로드' 토글 사용
-        4. **분석 기간**: 시작일/종료일 설정 (기본 30일)
-
-        ##### **▶ 2단계: 설정값 파일 불러오기**
-        1. **[2. 납품 설정 관리]** 섹션을 확장합니다
-        2. **'설정 파일을 업로드하세요'** 버튼을 클릭합니다
-        3. **매입처 제공 설정값 파일을 선택**합니다
-        4. **설정값 확인**: 
-           - 마스터 기본값이 파란색 박스에 표시됩니다
-           - 품목별 상세 설정이 목록으로 표시됩니다
-
-        ##### **▶ 3단계: 납품량 계산 및 결과 확인**
-        1. **🚀 납품량 계산 실행** 버튼을 클릭합니다
-        2. **요약 대시보드 확인**: 6개 핵심 지표를 한눈에 파악
-           - 추천 품목수, 추천 수량, 예상 금액
-           - 초과재고 상품 수, 초과재고 수량, 초과재고 합계
-        3. **긴급 납품 그래프**: 가장 시급한 상품들의 시각적 확인
-        4. **납품 추천 상품 목록**: 상세한 납품 계획 확인
-        5. **📥 엑셀 다운로드**: 결과를 엑셀 파일로 저장
+    if st.toggle("📖 시스템 설명"):
+        st.markdown(load_help_text('system_guide'))
 
-        ---
-
-        #### **3. 주요 기능 상세 설명**
-
-        ##### **📊 요약 대시보드 (6개 지표)**
-        • **추천 품목수**: 납품이 필요한 상품의 총 개수
-        • **추천 수량**: 모든 납품 추천 상품의 총 수량  
-        • **예상 금액**: 추천 수량 기준 예상 납품 비용
-        • **초과재고 상품 수**: 재고가 과다한 상품 개수
-        • **초과재고 수량**: 과다 재고의 총 수량
-        • **초과재고 합계**: 과다 재고의 총 금액
-
-        ##### **🚨 납품 상태 구분**
-        • **납품 필요 (긴급)**: 즉시 납품이 필요한 위험 상태 (빨간색)
-        • **납품 필요**: 계획된 납품이 필요한 상태
-        • **재고 충분**: 당분간 납품이 불필요한 상태
-        • **초과재고**: 재고가 과도하여 관리가 필요한 상태
-
-        ##### **⚙️ 설정값 관리**
-        • **자동 저장**: 설정값 파일 업로드 시 자동으로 영구 저장
-        • **자동 로드**: 프로그램 재시작 시 마지막 설정값 자동 적용
-        • **설정 교체**: 새로운 설정값 파일 업로드 시 기존 설정 완전 교체
-
-        ---
-
-        #### **4. 고급 활용 팁**
-
-        ##### **🔄 일상 업무 워크플로우**
-        1. **매일**: 프로그램 실행 → 자동으로 저장된 설정값 로드
-        2. **주기적**: 최신 매출현황 파일 확인 → 납품량 계산 실행
-        3. **설정 변경 시**: 새로운 설정값 파일 업로드 → 자동 저장/적용
-
-        ##### **📈 결과 해석 가이드**
-        • **긴급 납품 품목**: 우선순위가 높은 납품 대상
-        • **재고 소진 예상일**: 숫자가 작을수록 시급함
-        • **초과재고 현황**: 재고 최적화가 필요한 품목들
-
-        ##### **🎯 효율적인 사용법**
-        • **정기 점검**: 주 1-2회 정기적인 납품량 계산
-        • **긴급 대응**: 예상치 못한 주문 증가 시 즉시 재계산
-        • **설정 업데이트**: 매입처에서 새로운 설정값 제공 시 즉시 적용
-
-        ---
-
-        #### **5. 문제 해결 가이드**
-
-        ##### **❓ 자주 묻는 질문**
-        • **Q**: 설정값이 표시되지 않아요
-        • **A**: 매출현황 파일이 먼저 업로드되어 있는지 확인하세요
-
-        • **Q**: 계산 결과가 이상해요  
-        • **A**: 분석 기간과 설정값이 올바른지 확인 후 재계산하세요
-
-        • **Q**: 프로그램을 재시작했는데 설정값이 사라졌어요
-        • **A**: 설정값 파일을 다시 업로드하면 자동으로 저장됩니다
-
-        ##### **🔧 해결 단계**
-        1. **파일 확인**: 매출현황 파일과 설정값 파일 모두 준비
-        2. **순서 준수**: 매출현황 → 설정값 → 계산 실행 순서로 진행  
-        3. **재시작**: 문제 발생 시 페이지 새로고침 후 다시 시도
-
-        **더 자세한 도움이 필요하시면 시스템 관리자에게 문의하세요!**
-        """)
-
-# --- 이하 모든 코드는 이전과 완전히 동일합니다 ---
+    if st.toggle("📋 사용 메뉴얼"):
+        st.markdown(load_help_text('user_manual'))
 
 # ### 수정 1: Session State 초기화 방식 변경 ###
 # 파일에서 설정을 불러오는 대신, 항상 비어있는 기본 설정으로 시작합니다.
 if 'settings' not in st.session_state: 
-    st.session_state.settings = {"master_defaults": INITIAL_DEFAULT_SETTINGS.copy(), "defaults": {}, "overrides": {}}
+    st.session_state.settings = default_settings()
     
 if 'suppliers' not in st.session_state: st.session_state.suppliers = []
-if 'result_df' not in st.session_state: st.session_state.result_df = pd.DataFrame()
+if 'result_views' not in st.session_state: set_result(pd.DataFrame())
 if 'searched_item' not in st.session_state: st.session_state.searched_item = None
 
 with st.expander("1. 분석 대상 파일 및 기간 설정", expanded=True):
@@ -400,12 +148,12 @@ with st.expander("1. 분석 대상 파일 및 기간 설정", expanded=True):
     else:
         st.error("기간 설정이 올바르지 않습니다.")
 
+input_hash = None
 if target_file_path:
     try:
-        df_for_suppliers = pd.read_excel(target_file_path)
-        if COL_SUPPLIER in df_for_suppliers.columns:
-            unique_suppliers = sorted([str(s) for s in df_for_suppliers[COL_SUPPLIER].unique() if str(s) != 'nan'])
-            st.session_state.suppliers = unique_suppliers
+        input_hash = compute_input_hash(target_file_path)
+        df_for_suppliers = load_sales_data(input_hash, target_file_path)
+        st.session_state.suppliers = list_suppliers(df_for_suppliers)
         
         # 현황 파일 데이터를 세션에 저장 (설정값과 매칭용)
         st.session_state.current_data_for_matching = df_for_suppliers
@@ -429,44 +177,19 @@ with st.expander("2. 납품 설정 관리"):
                     st.session_state.last_settings_file = current_file_name
                     
                     settings_df = pd.read_excel(uploaded_settings_file)
+                    master_settings, individual_settings, overrides = parse_settings_df(settings_df)
                     
                     # 새로운 설정 파일 업로드 시 기존 설정 완전히 초기화
-                    st.session_state.settings["overrides"] = {}
-                    st.session_state.loaded_individual_settings = []
+                    st.session_state.settings["overrides"] = overrides
+                    st.session_state.loaded_individual_settings = individual_settings
                     
-                    # 매입처별 기본값 찾기
-                    master_row = settings_df[settings_df['설정구분'] == '매입처별 기본값']
-                    if not master_row.empty:
-                        master_data = master_row.iloc[0]
-                        st.session_state.loaded_master_settings = {
-                            'lead_time': int(master_data.get('리드타임(재발주기간)(일)', 15)),
-                            'safety_stock_rate': int(master_data.get('안전재고율(%)', 10)),
-                            'addition_rate': int(master_data.get('가산율(%)', 0)),
-                            'order_unit': int(master_data.get('발주단위', 5)),
-                            'min_sales': int(master_data.get('제외매출수량', 0))
-                        }
-                        
-                        # 세션 상태의 settings 업데이트
-                        st.session_state.settings["master_defaults"] = st.session_state.loaded_master_settings.copy()
+                    # 매입처별 기본값이 있으면 세션 상태의 settings 업데이트
+                    if master_settings is not None:
+                        st.session_state.loaded_master_settings = master_settings
+                        st.session_state.settings["master_defaults"] = master_settings.copy()
                         
                         st.success("설정값이 성공적으로 불러와졌습니다.")
                     
-                    # 개별 품목 설정 찾기
-                    individual_rows = settings_df[settings_df['설정구분'] == '개별 품목 설정']
-                    if not individual_rows.empty:
-                        st.session_state.loaded_individual_settings = individual_rows.to_dict('records')
-                        
-                        # 세션 상태의 overrides 업데이트
-                        for setting in st.session_state.loaded_individual_settings:
-                            item_code = str(setting.get('상품코드', ''))
-                            st.session_state.settings["overrides"][item_code] = {
-                                'lead_time': int(setting.get('리드타임(재발주기간)(일)', 0)),
-                                'safety_stock_rate': int(setting.get('안전재고율(%)', 0)),
-                                'addition_rate': int(setting.get('가산율(%)', 0)),
-                                'order_unit': int(setting.get('발주단위', 1)),
-                                'min_sales': int(setting.get('제외매출수량', 0))
-                            }
-                    
                     # 화면 갱신을 위한 rerun (파일이 변경된 경우에만 실행)
                     st.rerun()
                     
@@ -531,74 +254,43 @@ if st.button("납품량 계산 실행", type="primary"):
     if target_file_path and period_days > 0:
         with st.spinner('데이터를 분석하고 있습니다...'):
             try:
-                df = pd.read_excel(target_file_path)
-                numeric_cols_to_clean = [COL_UNIT_PRICE, COL_SALES, COL_STOCK]
-                for col in numeric_cols_to_clean:
-                    if col in df.columns:
-                        df[col] = pd.to_numeric(df[col], errors='coerce').fillna(0).astype('int64')
-
-                original_item_count = len(df)
-                exclude_pattern = '|'.join(EXCLUDE_KEYWORDS)
-                df_filtered = df[~df[COL_ITEM_NAME].astype(str).str.contains(exclude_pattern, na=False)].copy()
-                keyword_excluded_count = original_item_count - len(df_filtered)
-
-                df_filtered['min_sales_applied'] = df_filtered.apply(get_min_sales_for_row, axis=1, settings=st.session_state.settings)
-                df_final_filtered = df_filtered[df_filtered[COL_SALES] >= df_filtered['min_sales_applied']].copy()
-                df_final_filtered.drop(columns=['min_sales_applied'], inplace=True)
-
-                sales_excluded_count = len(df_filtered) - len(df_final_filtered)
-                st.info(f"총 {original_item_count}개 품목 중, 키워드로 {keyword_excluded_count}개, 매출수량 기준으로 {sales_excluded_count}개를 제외하고 계산합니다.")
-
-                required_cols = [COL_ITEM_CODE, COL_ITEM_NAME, COL_UNIT_PRICE, COL_SUPPLIER, COL_SALES, COL_STOCK]
-                if not all(col in df.columns for col in required_cols):
-                    missing_cols = [col for col in required_cols if col not in df.columns]
+                df = load_sales_data(input_hash, target_file_path)
+                df_final_filtered, keyword_excluded_count, sales_excluded_count = filter_items(df, st.session_state.settings)
+                st.info(f"총 {len(df)}개 품목 중, 키워드로 {keyword_excluded_count}개, 매출수량 기준으로 {sales_excluded_count}개를 제외하고 계산합니다.")
+
+                missing_cols = missing_required_columns(df)
+                if missing_cols:
                     st.error(f"엑셀 파일에 필수 컬럼이 없습니다: {', '.join(missing_cols)}")
                 else:
                     result_df = calculate_order_quantity(df_final_filtered, st.session_state.settings, period_days)
-                    st.session_state.result_df = result_df
+                    set_result(result_df)
                     st.success("납품량 계산이 완료되었습니다.")
+                    # 모든 품목이 제외되어 결과가 비었으면 비교할 내용이 없으므로 이력에 남기지 않습니다.
+                    # 읽기 전용 파일 시스템에서는 이력 저장만 건너뛰고 계산 결과는 그대로 사용합니다.
+                    if not result_df.empty:
+                        try:
+                            save_run(result_df, st.session_state.settings, input_hash, start_date, end_date, period_days)
+                        except OSError as e:
+                            st.warning(f"실행 이력을 저장하지 못했습니다: {e}")
             except Exception as e:
                 st.error(f"파일 처리 또는 계산 중 오류 발생: {e}")
-                st.session_state.result_df = pd.DataFrame()
+                set_result(pd.DataFrame())
 
-if not st.session_state.result_df.empty:
-    result_df = st.session_state.result_df.copy()
-    if COL_SPEC in result_df.columns:
-        result_df['상품명 (규격)'] = result_df[COL_ITEM_NAME].astype(str) + result_df[COL_SPEC].apply(lambda x: f' ({x})' if pd.notna(x) and str(x).strip() != '' else '')
-    else:
-        result_df['상품명 (규격)'] = result_df[COL_ITEM_NAME]
+if st.session_state.result_views is not None:
+    result_views = st.session_state.result_views
     st.header("📊 요약 대시보드 및 결과 데이터")
     
-    df_for_view = result_df
-    order_needed_df = df_for_view[df_for_view['추천 납품량'] > 0].copy()
-    overstock_df = df_for_view[df_for_view['비고'].isin(['초과재고', '악성 초과재고'])].copy()
+    order_needed_df = result_views['order_needed']
+    overstock_df = result_views['overstock']
+    urgent_order_df = order_needed_df[order_needed_df['비고'] == '납품 필요 (긴급)']
 
     # 요약 대시보드 메트릭 계산
-    total_order_items = len(order_needed_df) if not order_needed_df.empty else 0
+    total_order_items = len(order_needed_df)
     total_order_quantity = order_needed_df['추천 납품량'].sum() if not order_needed_df.empty else 0
-    
-    if not order_needed_df.empty:
-        order_needed_df.loc[:, '예상 납품 금액'] = order_needed_df['추천 납품량'] * order_needed_df[COL_UNIT_PRICE]
-        total_order_cost = order_needed_df['예상 납품 금액'].sum()
-    else:
-        total_order_cost = 0
-    
-    total_overstock_items = len(overstock_df) if not overstock_df.empty else 0
-    
-    if not overstock_df.empty:
-        # 초과재고 비율 계산
-        overstock_df.loc[:, '초과재고 비율 (재고/매출)'] = overstock_df[COL_STOCK] / overstock_df[COL_SALES].replace(0, np.nan)
-        median_ratio = overstock_df['초과재고 비율 (재고/매출)'].median()
-        if pd.notna(median_ratio):
-            malignant_rows_mask = overstock_df['초과재고 비율 (재고/매출)'] >= median_ratio
-            overstock_df.loc[:, '비고'] = np.where(malignant_rows_mask, "악성 초과재고", "초과재고")
-        
-        total_overstock_quantity = overstock_df['초과재고 수량'].sum()
-        overstock_df.loc[:, '초과재고 금액'] = overstock_df['초과재고 수량'] * overstock_df[COL_UNIT_PRICE]
-        total_overstock_cost = overstock_df['초과재고 금액'].sum()
-    else:
-        total_overstock_quantity = 0
-        total_overstock_cost = 0
+    total_order_cost = order_needed_df['예상 납품 금액'].sum() if not order_needed_df.empty else 0
+    total_overstock_items = len(overstock_df)
+    total_overstock_quantity = overstock_df['초과재고 수량'].sum() if not overstock_df.empty else 0
+    total_overstock_cost = overstock_df['초과재고 금액'].sum() if not overstock_df.empty else 0
 
     # 6개 메트릭 표시
     kpi_cols = st.columns(6)
@@ -611,7 +303,6 @@ if not st.session_state.result_df.empty:
 
     st.divider()
     
-    urgent_order_df = df_for_view[df_for_view['비고'] == '납품 필요 (긴급)'].copy()
     if not urgent_order_df.empty:
         display_ratio = st.slider("표시할 긴급 납품 품목 비율 (%)", min_value=10, max_value=100, value=25, step=5)
         num_to_show = math.ceil(len(urgent_order_df) * (display_ratio / 100))
@@ -619,22 +310,14 @@ if not st.session_state.result_df.empty:
         
         graph_data = urgent_order_df.nlargest(num_to_show, '추천 납품량')
         st.subheader(f"긴급 납품 Top {num_to_show}개 (추천량 순)")
-        fig = px.bar(graph_data, x='상품명 (규격)', y='추천 납품량', 
-                     hover_data=[COL_ITEM_CODE, COL_BARCODE, '현재고', '재고 소진 예상일'],
-                     labels={'추천 납품량': '추천 납품 수량', '상품명 (규격)': '상품명'})
-        st.plotly_chart(fig, use_container_width=True)
+        st.plotly_chart(urgent_order_figure(graph_data), use_container_width=True)
 
     st.divider()
     
     st.header("📑 납품 추천 상품")
     st.caption("추천 납품량이 0보다 큰 품목만 표시됩니다.")
     
-    display_columns_order = [
-        COL_ITEM_CODE, '상품명 (규격)', COL_BARCODE, COL_STOCK, COL_SALES,
-        '재고 소진 예상일', '추천 납품량', '비고', '적용된 설정',
-        COL_UNIT_PRICE, '예상 납품 금액'
-    ]
-    final_display_columns = [col for col in display_columns_order if col in order_needed_df.columns]
+    final_display_columns = [col for col in ORDER_DISPLAY_COLUMNS if col in order_needed_df.columns]
     
     if not order_needed_df.empty:
         df_to_display_main = order_needed_df[final_display_columns]
@@ -659,20 +342,7 @@ if not st.session_state.result_df.empty:
         if '추천 납품량' in final_display_columns: total_cols[final_display_columns.index('추천 납품량')].markdown(f"<div class='total-cell'>{sum_order_qty:,.0f}</div>", unsafe_allow_html=True)
         if '예상 납품 금액' in final_display_columns: total_cols[final_display_columns.index('예상 납품 금액')].markdown(f"<div class='total-cell'>₩ {sum_order_cost:,.0f}</div>", unsafe_allow_html=True)
 
-        output = BytesIO()
-        with pd.ExcelWriter(output, engine='xlsxwriter') as writer:
-            # 엑셀 다운로드용 컬럼 선택
-            excel_columns = [
-                COL_ITEM_CODE, '상품명 (규격)', COL_BARCODE, COL_STOCK, COL_SALES,
-                '추천 납품량', '비고', '적용된 설정'
-            ]
-            excel_df = df_to_display_main[excel_columns]
-            excel_df.to_excel(writer, index=False, sheet_name='OrderList')
-            for column in excel_df:
-                column_length = max(excel_df[column].astype(str).map(len).max(), len(column))
-                col_idx = excel_df.columns.get_loc(column)
-                writer.sheets['OrderList'].set_column(col_idx, col_idx, column_length + 2)
-        st.download_button(label="📥 엑셀 다운로드", data=output.getvalue(), file_name=f"납품추천결과_{datetime.datetime.now().strftime('%Y%m%d')}.xlsx")
+        st.download_button(label="📥 엑셀 다운로드", data=st.session_state.order_excel, file_name=f"납품추천결과_{datetime.datetime.now().strftime('%Y%m%d')}.xlsx")
 
     st.divider()
     
@@ -680,11 +350,7 @@ if not st.session_state.result_df.empty:
     
     if not overstock_df.empty:
         
-        overstock_display_cols_order = [
-            COL_ITEM_CODE, '상품명 (규격)', COL_BARCODE, COL_STOCK, '초과재고 수량', COL_SALES, 
-            '재고 소진 예상일', '초과재고 비율 (재고/매출)', COL_UNIT_PRICE, '초과재고 금액', '비고'
-        ]
-        final_overstock_cols = [col for col in overstock_display_cols_order if col in overstock_df.columns]
+        final_overstock_cols = [col for col in OVERSTOCK_DISPLAY_COLUMNS if col in overstock_df.columns]
         df_to_display_overstock = overstock_df[final_overstock_cols]
         
         st.dataframe(df_to_display_overstock.style.format(formatter={
@@ -708,14 +374,63 @@ if not st.session_state.result_df.empty:
         if COL_SALES in final_overstock_cols: overstock_total_cols[final_overstock_cols.index(COL_SALES)].markdown(f"<div class='total-cell'>{overstock_sum_sales:,.0f}</div>", unsafe_allow_html=True)
         if '초과재고 금액' in final_overstock_cols: overstock_total_cols[final_overstock_cols.index('초과재고 금액')].markdown(f"<div class='total-cell'>₩ {overstock_sum_over_cost:,.0f}</div>", unsafe_allow_html=True)
 
-        overstock_output = BytesIO()
-        with pd.ExcelWriter(overstock_output, engine='xlsxwriter') as writer:
-            df_to_display_overstock.to_excel(writer, index=False, sheet_name='Overstock')
-            for column in df_to_display_overstock:
-                column_length = max(df_to_display_overstock[column].astype(str).map(len).max(), len(column))
-                col_idx = df_to_display_overstock.columns.get_loc(column)
-                writer.sheets['Overstock'].set_column(col_idx, col_idx, column_length + 2)
-        
-        st.download_button(label="📥 초과재고 현황 엑셀 다운로드", data=overstock_output.getvalue(), file_name=f"초과재고현황_{datetime.datetime.now().strftime('%Y%m%d')}.xlsx")
+        st.download_button(label="📥 초과재고 현황 엑셀 다운로드", data=st.session_state.overstock_excel, file_name=f"초과재고현황_{datetime.datetime.now().strftime('%Y%m%d')}.xlsx")
     else:
-        st.info("초과재고로 분류된 품목이 없습니다.")
\ No newline at end of file
+        st.info("초과재고로 분류된 품목이 없습니다.")
+st.divider()
+
+st.header("🕘 실행 이력 비교")
+run_index = load_run_index_cached(list_run_ids())
+if len(run_index) < 2:
+    st.caption("비교하려면 납품량 계산을 2회 이상 실행해야 합니다.")
+else:
+    run_index = run_index.sort_values('created_at', ascending=False).reset_index(drop=True)
+    # 같은 초에 저장된 실행도 구분되도록 실행 번호를 붙여 선택지로 사용합니다.
+    run_ids_by_label = {f"#{len(run_index) - i} | {format_run_label(row)}": row['run_id'] for i, row in run_index.iterrows()}
+    run_labels = list(run_ids_by_label)
+
+    history_cols = st.columns(2)
+    with history_cols[0]:
+        prev_run_id = run_ids_by_label[st.selectbox("기준 실행 (이전)", run_labels, index=1)]
+    with history_cols[1]:
+        curr_run_id = run_ids_by_label[st.selectbox("비교 실행 (현재)", run_labels, index=0)]
+
+    if prev_run_id == curr_run_id:
+        st.info("서로 다른 두 실행을 선택하세요.")
+    else:
+        try:
+            diff_df = cached_run_diff(prev_run_id, curr_run_id)
+        except (OSError, ValueError) as e:
+            st.error(f"실행 이력을 불러오는 중 오류 발생: {e}")
+            diff_df = None
+
+        if diff_df is not None:
+            change_counts = diff_df['변경 구분'].value_counts()
+            diff_kpi_cols = st.columns(5)
+            diff_kpi_cols[0].metric("신규 납품", f"{change_counts.get('신규 납품', 0)} 개")
+            diff_kpi_cols[1].metric("납품 제외", f"{change_counts.get('납품 제외', 0)} 개")
+            diff_kpi_cols[2].metric("수량 변경", f"{change_counts.get('수량 변경', 0)} 개")
+            diff_kpi_cols[3].metric("상태 변경", f"{change_counts.get('상태 변경', 0)} 개")
+            diff_kpi_cols[4].metric("금액 변화", f"₩ {diff_df['금액 변화'].sum():,.0f}")
+
+            if diff_df.empty:
+                st.info("두 실행 사이에 변경된 품목이 없습니다.")
+            else:
+                change_filter = st.multiselect("변경 구분 필터", CHANGE_TYPES)
+                diff_to_display = diff_df[diff_df['변경 구분'].isin(change_filter)] if change_filter else diff_df
+                # 비교 결과는 금액 변화가 큰 순서이므로, 행이 많으면 상위 품목만 표시합니다. (Styler 셀 수 제한 회피)
+                if len(diff_to_display) > DIFF_DISPLAY_MAX_ROWS:
+                    st.caption(f"변경 품목 {len(diff_to_display):,}개 중 금액 변화가 큰 상위 {DIFF_DISPLAY_MAX_ROWS:,}개만 표시합니다. "
+                               "변경 구분 필터로 범위를 좁힐 수 있습니다.")
+                    diff_to_display = diff_to_display.head(DIFF_DISPLAY_MAX_ROWS)
+                diff_column_config = {
+                    '이전 납품량': st.column_config.NumberColumn(format="%d"),
+                    '현재 납품량': st.column_config.NumberColumn(format="%d"),
+                    '납품량 변화': st.column_config.NumberColumn(format="%+d"),
+                    '금액 변화': st.column_config.NumberColumn(format="₩%+d"),
+                }
+                if len(diff_to_display) <= DIFF_STYLE_MAX_ROWS:
+                    diff_to_display = diff_to_display.style.format(formatter={
+                        '이전 납품량': "{:,.0f}", '현재 납품량': "{:,.0f}", '납품량 변화': "{:+,.0f}", '금액 변화': "₩{:+,.0f}"
+                    }, na_rep='').map(style_remarks, subset=['현재 비고'])
+                st.dataframe(diff_to_display, column_config=diff_column_config, use_container_width=True, hide_index=True, height=735)
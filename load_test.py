@@ -0,0 +1,337 @@
+# load_test.py
+# Streamlit 앱 테스트 기능(AppTest)으로 동시 세션 부하를 측정하는 스크립트입니다.
+# 사용 예: python load_test.py --sessions 8 --reruns 5 --skus 5000
+# 세션마다 현황 파일을 새로 읽는 경우(사용자별 업로드): python load_test.py --sessions 8 --distinct-inputs
+# 단일 세션 벤치마크(콜드 스타트, 슬라이더 재실행): python load_test.py --benchmark --skus 20000
+#   이전 버전과 비교: git show <커밋>:SCM_AutoOrder1.0.py > /tmp/old_app.py
+#                    python load_test.py --benchmark --skus 20000 --app /tmp/old_app.py
+import argparse
+import datetime
+import json
+import os
+import subprocess
+import sys
+import tempfile
+import threading
+import time
+import traceback
+from concurrent.futures import ThreadPoolExecutor
+from pathlib import Path
+from typing import Dict, List, Optional
+from unittest.mock import MagicMock
+
+import numpy as np
+import pandas as pd
+import streamlit as st
+from streamlit.runtime import Runtime
+from streamlit.runtime.caching.storage.dummy_cache_storage import MemoryCacheStorageManager
+from streamlit.runtime.memory_media_file_storage import MemoryMediaFileStorage
+from streamlit.runtime.media_file_manager import MediaFileManager
+from streamlit.runtime.scriptrunner.script_cache import ScriptCache
+from streamlit.testing.v1 import AppTest, app_test, local_script_runner
+
+from scm_autoorder import ingest
+from scm_autoorder.settings import default_settings, parse_settings_df
+
+APP_SCRIPT = Path(__file__).resolve().parent / 'SCM_AutoOrder1.0.py'
+CALCULATE_BUTTON_LABEL = "납품량 계산 실행"
+URGENT_SLIDER_LABEL = "표시할 긴급 납품 품목 비율 (%)"
+SLIDER_VALUES = [10, 25, 50, 75, 100]
+SESSION_NO_KEY = 'load_test_session_no'
+
+
+# --- 1. 합성 입력 파일 생성 ---
+def build_sales_df(num_skus: int, seed: int = 0) -> pd.DataFrame:
+    rng = np.random.default_rng(seed)
+    item_codes = np.arange(num_skus) + 100000000
+    return pd.DataFrame({
+        '상품코드': item_codes,
+        '상품명': [f'테스트상품{i}' for i in range(num_skus)],
+        '규격': rng.choice(['500g', '1kg', '2kg', ''], num_skus),
+        '바코드': item_codes + 8800000000000,
+        '매출수량': rng.integers(0, 600, num_skus),
+        '현구매단가': rng.integers(100, 50000, num_skus),
+        '현재고': rng.integers(0, 600, num_skus),
+        '매입처': rng.choice(['하이온', '매입처A', '매입처B'], num_skus),
+    })
+
+def build_settings_df(sales_df: pd.DataFrame, num_overrides: int, seed: int = 0) -> pd.DataFrame:
+    # 매입처 제공 설정값 파일과 같은 형식: 마스터 1행 + 개별 품목 설정 N행
+    rng = np.random.default_rng(seed)
+    master_row = {'설정구분': '매입처별 기본값', '상품코드': '', '리드타임(재발주기간)(일)': 7,
+                  '안전재고율(%)': 10, '가산율(%)': 0, '발주단위': 5, '제외매출수량': 5}
+    override_codes = rng.choice(sales_df['상품코드'].to_numpy(), size=min(num_overrides, len(sales_df)), replace=False)
+    override_rows = [{'설정구분': '개별 품목 설정', '상품코드': str(code),
+                      '리드타임(재발주기간)(일)': int(rng.integers(3, 30)), '안전재고율(%)': int(rng.integers(0, 30)),
+                      '가산율(%)': int(rng.integers(0, 10)), '발주단위': int(rng.choice([1, 2, 5, 10])), '제외매출수량': 0}
+                     for code in override_codes]
+    return pd.DataFrame([master_row] + override_rows)
+
+def settings_from_file(settings_path: Path) -> Dict[str, Dict]:
+    # AppTest는 file_uploader를 조작할 수 없으므로, 엔진의 설정 파일 해석 함수로 읽어 session_state에 주입합니다.
+    master_settings, _, overrides = parse_settings_df(pd.read_excel(settings_path))
+    settings = default_settings()
+    # 매입처별 기본값 행이 없으면 앱과 마찬가지로 초기 기본값을 그대로 사용합니다.
+    if master_settings is not None:
+        settings["master_defaults"] = master_settings
+    settings["overrides"] = overrides
+    return settings
+
+def prepare_workspace(workspace: Path, num_skus: int, num_overrides: int) -> Dict[str, Dict]:
+    # 앱은 홈 디렉터리의 Downloads 폴더에서 '현황*.xlsx'를 자동 검색하므로, 임시 홈에 현황 파일을 둡니다.
+    downloads = workspace / 'Downloads'
+    downloads.mkdir(parents=True, exist_ok=True)
+    sales_df = build_sales_df(num_skus)
+    sales_df.to_excel(downloads / f"현황{datetime.datetime.now().strftime('%Y%m%d_%H%M%S')}.xlsx", index=False)
+    settings_path = workspace / f"하이온_품목별설정값_{datetime.datetime.now().strftime('%Y%m%d_%H%M%S')}.xlsx"
+    build_settings_df(sales_df, num_overrides).to_excel(settings_path, index=False)
+    return settings_from_file(settings_path)
+
+
+# --- 2. 측정 도구 ---
+def current_rss_mb() -> float:
+    # Linux는 /proc 에서 현재 RSS를, 그 외 환경은 최대 RSS를 사용합니다.
+    try:
+        with open('/proc/self/statm', 'r') as f:
+            resident_pages = int(f.read().split()[1])
+        return resident_pages * os.sysconf('SC_PAGE_SIZE') / (1024 * 1024)
+    except (OSError, ValueError, AttributeError):
+        import resource
+        max_rss = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+        return max_rss / (1024 * 1024) if sys.platform == 'darwin' else max_rss / 1024
+
+class RssSampler:
+    # 부하 테스트 동안 백그라운드 스레드에서 RSS를 주기적으로 측정해 최대값을 기록합니다.
+    def __init__(self, interval: float = 0.05):
+        self.interval = interval
+        self.peak_mb = current_rss_mb()
+        self._stop = threading.Event()
+        self._thread = threading.Thread(target=self._run, name='RssSampler', daemon=True)
+
+    def _run(self) -> None:
+        while not self._stop.wait(self.interval):
+            self.peak_mb = max(self.peak_mb, current_rss_mb())
+
+    def __enter__(self) -> 'RssSampler':
+        self._thread.start()
+        return self
+
+    def __exit__(self, *exc_info) -> None:
+        self._stop.set()
+        self._thread.join()
+        self.peak_mb = max(self.peak_mb, current_rss_mb())
+
+class _SharedRuntimeMeta(type):
+    def __setattr__(cls, name, value):
+        # AppTest는 실행마다 Runtime._instance를 바꾸고 None으로 되돌리므로, 동시 세션끼리 충돌하지 않도록 무시합니다.
+        if name == '_instance':
+            return
+        super().__setattr__(name, value)
+
+class _SharedRuntime(Runtime, metaclass=_SharedRuntimeMeta):
+    pass
+
+def install_shared_runtime() -> None:
+    # 실제 서버처럼 모든 세션이 하나의 런타임(캐시, 미디어 파일 저장소)과 컴파일된 스크립트 캐시를 공유하도록 합니다.
+    # 세션마다 스크립트를 동시에 compile()하면 Python 3.11에서 AST 오류가 간헐적으로 발생하는 문제도 함께 피합니다.
+    shared_runtime = MagicMock(spec=Runtime)
+    shared_runtime.media_file_mgr = MediaFileManager(MemoryMediaFileStorage("/mock/media"))
+    shared_runtime.cache_storage_manager = MemoryCacheStorageManager()
+    Runtime._instance = shared_runtime
+    app_test.Runtime = _SharedRuntime
+    shared_script_cache = ScriptCache()
+    local_script_runner.ScriptCache = lambda: shared_script_cache
+
+def install_distinct_inputs() -> None:
+    # 모든 세션이 같은 현황 파일을 자동으로 읽어 load_sales_data 캐시를 공유하므로, 세션 번호를 입력 해시에 붙여
+    # 사용자마다 다른 파일을 올린 것처럼 캐시를 나눕니다. 앱이 실행마다 ingest 모듈에서 함수를 가져오므로 여기서 교체합니다.
+    original_hash = ingest.compute_input_hash
+
+    def per_session_input_hash(source) -> str:
+        return f"{original_hash(source)}_{st.session_state.get(SESSION_NO_KEY, '')}"
+
+    ingest.compute_input_hash = per_session_input_hash
+
+def percentile(values: List[float], q: float) -> float:
+    return float(np.percentile(values, q)) if values else float('nan')
+
+def find_by_label(elements, label: str):
+    for element in elements:
+        if element.label == label:
+            return element
+    return None
+
+
+# --- 3. 세션 시나리오 ---
+def new_session(app_script: Path, settings: Dict[str, Dict], timeout: float) -> AppTest:
+    at = AppTest.from_file(str(app_script), default_timeout=timeout)
+    at.session_state['settings'] = {k: (v.copy() if isinstance(v, dict) else v) for k, v in settings.items()}
+    at.session_state['loaded_master_settings'] = settings["master_defaults"].copy()
+    return at
+
+def run_session(session_no: int, settings: Dict[str, Dict], reruns: int, timeout: float,
+                start_barrier: Optional[threading.Barrier] = None, app_script: Path = APP_SCRIPT) -> Dict:
+    latencies: Dict[str, List[float]] = {'initial': [], 'calculate': [], 'slider': []}
+    errors: List[str] = []
+    at = new_session(app_script, settings, timeout)
+    at.session_state[SESSION_NO_KEY] = session_no
+
+    def timed(kind: str, action) -> None:
+        started = time.perf_counter()
+        try:
+            action()
+        except Exception:
+            errors.append(f"[세션 {session_no}] {kind}: {traceback.format_exc(limit=1).strip()}")
+            return
+        latencies[kind].append(time.perf_counter() - started)
+        if at.exception:
+            errors.append(f"[세션 {session_no}] {kind}: {at.exception[0].message}")
+
+    if start_barrier is not None:
+        start_barrier.wait()
+    timed('initial', at.run)
+    for i in range(reruns):
+        button = find_by_label(at.button, CALCULATE_BUTTON_LABEL)
+        if button is None:
+            reason = at.exception[0].message if at.exception else "계산 버튼을 찾지 못했습니다."
+            errors.append(f"[세션 {session_no}] {reason}")
+            break
+        timed('calculate', lambda: button.click().run())
+
+        slider = find_by_label(at.slider, URGENT_SLIDER_LABEL)
+        if slider is not None:
+            value = SLIDER_VALUES[(session_no + i) % len(SLIDER_VALUES)]
+            timed('slider', lambda: slider.set_value(value).run())
+    # 세션별 RSS를 측정할 때까지 세션(AppTest와 session_state)이 살아 있도록 함께 반환합니다.
+    return {**latencies, 'errors': errors, 'app': at}
+
+
+# --- 4. 단일 세션 벤치마크 ---
+def cold_run(app_script: Path, timeout: float) -> int:
+    # 새 인터프리터에서 실행되어, 앱 스크립트의 첫 실행(모듈 import, 현황 파일 읽기 포함) 시간을 JSON 한 줄로 출력합니다.
+    settings = settings_from_file(next(Path.cwd().glob('하이온_품목별설정값_*.xlsx')))
+    at = new_session(app_script, settings, timeout)
+    started = time.perf_counter()
+    at.run()
+    first_run = time.perf_counter() - started
+    if at.exception:
+        print(at.exception[0].message, file=sys.stderr)
+        return 1
+    print(json.dumps({'first_run': first_run, 'plotly_loaded': 'plotly.express' in sys.modules}))
+    return 0
+
+def run_benchmark(args, settings: Dict[str, Dict], workspace: Path) -> int:
+    cold_results = []
+    for _ in range(args.cold_runs):
+        completed = subprocess.run([sys.executable, str(Path(__file__).resolve()), '--cold-run',
+                                    '--app', str(args.app), '--timeout', str(args.timeout)],
+                                   cwd=workspace, capture_output=True, text=True)
+        if completed.returncode != 0:
+            print(completed.stderr, file=sys.stderr)
+            return 1
+        cold_results.append(json.loads(completed.stdout.strip().splitlines()[-1]))
+
+    # 재실행 비용: 한 세션에서 계산을 마친 뒤 긴급 품목 슬라이더를 반복해서 움직입니다.
+    at = new_session(args.app, settings, args.timeout)
+    at.run()
+    find_by_label(at.button, CALCULATE_BUTTON_LABEL).click().run()
+    slider_latencies = []
+    for i in range(args.slider_moves):
+        slider = find_by_label(at.slider, URGENT_SLIDER_LABEL)
+        if slider is None or at.exception:
+            reason = at.exception[0].message if at.exception else "긴급 품목 슬라이더를 찾지 못했습니다."
+            print(reason, file=sys.stderr)
+            return 1
+        started = time.perf_counter()
+        slider.set_value(SLIDER_VALUES[i % len(SLIDER_VALUES)]).run()
+        slider_latencies.append(time.perf_counter() - started)
+
+    first_runs = [result['first_run'] for result in cold_results]
+    print(f"앱 {Path(args.app).name} | 품목 {args.skus:,}개")
+    print(f"{'구분':<14}{'횟수':>6}{'p50(ms)':>12}{'p95(ms)':>12}")
+    print(f"{'cold start':<14}{len(first_runs):>6}{percentile(first_runs, 50) * 1000:>12.0f}"
+          f"{percentile(first_runs, 95) * 1000:>12.0f}")
+    print(f"{'slider rerun':<14}{len(slider_latencies):>6}{percentile(slider_latencies, 50) * 1000:>12.0f}"
+          f"{percentile(slider_latencies, 95) * 1000:>12.0f}")
+    print(f"첫 실행 후 plotly 로드: {'예' if any(result['plotly_loaded'] for result in cold_results) else '아니오'}")
+    return 0
+
+
+# --- 5. 실행 및 리포트 ---
+def main() -> int:
+    parser = argparse.ArgumentParser(description="SCM 자동 납품량 앱 동시 세션 부하 테스트")
+    parser.add_argument('--sessions', type=int, default=4, help="동시 세션 수")
+    parser.add_argument('--reruns', type=int, default=3, help="세션당 계산 버튼 클릭 + 슬라이더 이동 반복 횟수")
+    parser.add_argument('--skus', type=int, default=2000, help="합성 현황 파일의 품목 수")
+    parser.add_argument('--overrides', type=int, default=200, help="합성 설정 파일의 개별 품목 설정 수")
+    parser.add_argument('--warmup', type=int, default=1, help="측정 전 순차 실행할 예열 세션 수 (모듈 import, 캐시 적재)")
+    parser.add_argument('--timeout', type=float, default=300, help="재실행 1회당 제한 시간(초)")
+    parser.add_argument('--app', type=Path, default=APP_SCRIPT, help="측정할 앱 스크립트 (기본: 현재 앱)")
+    parser.add_argument('--distinct-inputs', action='store_true',
+                        help="세션마다 다른 현황 파일을 올린 것처럼 파일 캐시를 나눠, initial에 엑셀 읽기 시간을 포함")
+    parser.add_argument('--benchmark', action='store_true', help="동시 세션 대신 단일 세션의 콜드 스타트와 슬라이더 재실행 시간을 측정")
+    parser.add_argument('--cold-runs', type=int, default=3, help="벤치마크: 새 프로세스에서 첫 실행을 측정할 횟수")
+    parser.add_argument('--slider-moves', type=int, default=10, help="벤치마크: 슬라이더 재실행 측정 횟수")
+    parser.add_argument('--cold-run', action='store_true', help=argparse.SUPPRESS)
+    args = parser.parse_args()
+    args.app = args.app.resolve()
+
+    if args.cold_run:
+        return cold_run(args.app, args.timeout)
+
+    with tempfile.TemporaryDirectory(prefix='scm_load_test_') as tmp:
+        workspace = Path(tmp)
+        settings = prepare_workspace(workspace, args.skus, args.overrides)
+        # 프로세스 전체에 적용: 임시 홈에서 현황 파일을 찾고, 실행 이력(run_history)도 임시 폴더에 저장합니다.
+        os.environ['HOME'] = str(workspace)
+        os.environ['USERPROFILE'] = str(workspace)
+        os.chdir(workspace)
+
+        if args.benchmark:
+            return run_benchmark(args, settings, workspace)
+
+        install_shared_runtime()
+        if args.distinct_inputs:
+            install_distinct_inputs()
+        # 첫 실행의 지연 import(plotly 등)가 동시 세션 사이에서 경합하지 않도록 먼저 예열합니다.
+        for n in range(args.warmup):
+            warmup_errors = run_session(-1 - n, settings, 1, args.timeout, app_script=args.app)['errors']
+            if warmup_errors:
+                print('\n'.join(warmup_errors), file=sys.stderr)
+                return 1
+        baseline_rss = current_rss_mb()
+        start_barrier = threading.Barrier(args.sessions)
+        started = time.perf_counter()
+        with RssSampler() as rss_sampler:
+            with ThreadPoolExecutor(max_workers=args.sessions) as pool:
+                futures = [pool.submit(run_session, n, settings, args.reruns, args.timeout, start_barrier, args.app)
+                           for n in range(args.sessions)]
+                results = [future.result() for future in futures]
+            # 모든 세션이 결과 화면을 유지한 상태(세션 객체가 아직 참조됨)의 RSS
+            live_rss = current_rss_mb()
+        elapsed = time.perf_counter() - started
+        peak_rss = rss_sampler.peak_mb
+
+    print(f"세션 {args.sessions}개 | 세션당 반복 {args.reruns}회 | 품목 {args.skus:,}개 | 총 소요 {elapsed:.1f}초")
+    if args.distinct_inputs:
+        print("initial: 세션마다 현황 파일 읽기(pd.read_excel) 포함")
+    else:
+        print("initial: 현황 파일 읽기 제외 (모든 세션이 예열 세션의 파일 캐시를 사용, 포함하려면 --distinct-inputs)")
+    print(f"{'구분':<10}{'횟수':>6}{'p50(ms)':>12}{'p95(ms)':>12}{'max(ms)':>12}")
+    for kind in ['initial', 'calculate', 'slider']:
+        values = [v for result in results for v in result[kind]]
+        print(f"{kind:<10}{len(values):>6}{percentile(values, 50) * 1000:>12.0f}"
+              f"{percentile(values, 95) * 1000:>12.0f}{(max(values) if values else float('nan')) * 1000:>12.0f}")
+    num_sessions = max(args.sessions, 1)
+    print(f"RSS: 시작 {baseline_rss:.0f} MB | 실행 중 최대 {peak_rss:.0f} MB | 세션 유지 상태 {live_rss:.0f} MB")
+    print(f"세션당 RSS: 유지 {(live_rss - baseline_rss) / num_sessions:.1f} MB | "
+          f"최대 {(peak_rss - baseline_rss) / num_sessions:.1f} MB")
+
+    errors = [error for result in results for error in result['errors']]
+    for error in errors:
+        print(error, file=sys.stderr)
+    return 1 if errors else 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,40 @@
+# scm_autoorder/__init__.py
+# 자동 납품량 계산 엔진 (UI 없이 테스트, 배치 작업에서도 사용 가능)
+# 하위 모듈은 실제로 필요할 때만 import 됩니다. 예: from scm_autoorder import calculate_order_quantity
+import importlib
+
+_LAZY_EXPORTS = {
+    'calculate_order_quantity': 'engine',
+    'filter_items': 'engine',
+    'get_min_sales_for_row': 'engine',
+    'build_result_views': 'engine',
+    'find_latest_file': 'ingest',
+    'compute_input_hash': 'ingest',
+    'read_sales_file': 'ingest',
+    'missing_required_columns': 'ingest',
+    'list_suppliers': 'ingest',
+    'default_settings': 'settings',
+    'load_settings': 'settings',
+    'save_settings': 'settings',
+    'parse_settings_df': 'settings',
+    'to_excel_bytes': 'export',
+    'urgent_order_figure': 'charts',
+    'save_run': 'history',
+    'load_run': 'history',
+    'load_run_index': 'history',
+    'list_run_ids': 'history',
+    'load_settings_snapshot': 'history',
+    'diff_runs': 'history',
+    'format_run_label': 'history',
+    'load_help_text': 'help',
+}
+
+__all__ = sorted(_LAZY_EXPORTS)
+
+
+def __getattr__(name):
+    if name not in _LAZY_EXPORTS:
+        raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
+    value = getattr(importlib.import_module(f'.{_LAZY_EXPORTS[name]}', __name__), name)
+    globals()[name] = value
+    return value
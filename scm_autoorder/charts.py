@@ -0,0 +1,12 @@
+# scm_autoorder/charts.py
+import pandas as pd
+
+from .constants import COL_BARCODE, COL_ITEM_CODE, COL_ITEM_LABEL
+
+
+def urgent_order_figure(graph_data: pd.DataFrame):
+    # plotly는 import 비용이 크므로 긴급 납품 그래프를 실제로 그릴 때만 불러옵니다.
+    import plotly.express as px
+    return px.bar(graph_data, x=COL_ITEM_LABEL, y='추천 납품량',
+                  hover_data=[COL_ITEM_CODE, COL_BARCODE, '현재고', '재고 소진 예상일'],
+                  labels={'추천 납품량': '추천 납품 수량', COL_ITEM_LABEL: '상품명'})
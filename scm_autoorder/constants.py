@@ -0,0 +1,46 @@
+# scm_autoorder/constants.py
+from pathlib import Path
+
+# --- 입력 파일 및 컬럼 ---
+SETTINGS_FILE = 'item_settings.json'
+FILE_PATTERN = "현황*.xlsx"
+COL_ITEM_CODE = '상품코드'
+COL_ITEM_NAME = '상품명'
+COL_SPEC = '규격'
+COL_BARCODE = '바코드'
+COL_UNIT_PRICE = '현구매단가'
+COL_SUPPLIER = '매입처'
+COL_SALES = '매출수량'
+COL_STOCK = '현재고'
+COL_ITEM_LABEL = '상품명 (규격)'
+EXCLUDE_KEYWORDS = ['배송비', '첫 주문', '쿠폰', '개인결제', '마일리지']
+NUMERIC_COLUMNS = [COL_UNIT_PRICE, COL_SALES, COL_STOCK]
+REQUIRED_COLUMNS = [COL_ITEM_CODE, COL_ITEM_NAME, COL_UNIT_PRICE, COL_SUPPLIER, COL_SALES, COL_STOCK]
+INITIAL_DEFAULT_SETTINGS = {'lead_time': 15, 'safety_stock_rate': 10, 'addition_rate': 0, 'order_unit': 5, 'min_sales': 0}
+
+# --- 결과 표시 및 엑셀 다운로드 컬럼 ---
+ORDER_DISPLAY_COLUMNS = [
+    COL_ITEM_CODE, COL_ITEM_LABEL, COL_BARCODE, COL_STOCK, COL_SALES,
+    '재고 소진 예상일', '추천 납품량', '비고', '적용된 설정',
+    COL_UNIT_PRICE, '예상 납품 금액'
+]
+ORDER_EXCEL_COLUMNS = [
+    COL_ITEM_CODE, COL_ITEM_LABEL, COL_BARCODE, COL_STOCK, COL_SALES,
+    '추천 납품량', '비고', '적용된 설정'
+]
+OVERSTOCK_DISPLAY_COLUMNS = [
+    COL_ITEM_CODE, COL_ITEM_LABEL, COL_BARCODE, COL_STOCK, '초과재고 수량', COL_SALES,
+    '재고 소진 예상일', '초과재고 비율 (재고/매출)', COL_UNIT_PRICE, '초과재고 금액', '비고'
+]
+
+# 실행 이력 저장소: 실행마다 결과 parquet 파일(run_<id>.parquet)과 메타데이터 파일(run_<id>.json)을 1개씩 두고,
+# 설정 스냅샷은 설정 해시별 파일(settings_<hash>.json)에 한 번만 저장합니다.
+HISTORY_DIR = Path('run_history')
+HISTORY_COLUMNS = [COL_ITEM_CODE, COL_ITEM_NAME, COL_SPEC, COL_SUPPLIER, COL_UNIT_PRICE, COL_STOCK, COL_SALES, '추천 납품량', '비고']
+HISTORY_TEXT_COLUMNS = [COL_ITEM_CODE, COL_ITEM_NAME, COL_SPEC, COL_SUPPLIER]
+STATUS_MISSING = '(없음)'
+CHANGE_TYPES = ['신규 납품', '납품 제외', '수량 변경', '상태 변경']
+# 실행 비교 표: 10만 품목 규모에서는 변경 품목이 수만 개가 되므로 화면에는 상위 일부만 표시하고,
+# 셀마다 스타일을 계산하는 비고 강조(pandas Styler)는 작은 표에만 적용합니다.
+DIFF_DISPLAY_MAX_ROWS = 20000
+DIFF_STYLE_MAX_ROWS = 2000
@@ -0,0 +1,115 @@
+# scm_autoorder/engine.py
+import math
+from typing import Dict, Tuple
+
+import numpy as np
+import pandas as pd
+
+from .constants import (COL_ITEM_CODE, COL_ITEM_LABEL, COL_ITEM_NAME, COL_SALES, COL_SPEC, COL_STOCK,
+                        COL_SUPPLIER, COL_UNIT_PRICE, EXCLUDE_KEYWORDS, INITIAL_DEFAULT_SETTINGS)
+
+
+def get_min_sales_for_row(row: pd.Series, settings: Dict[str, Dict]) -> int:
+    item_code = str(row.get(COL_ITEM_CODE, ''))
+    supplier = str(row.get(COL_SUPPLIER, ''))
+    master_defaults = settings.get("master_defaults", INITIAL_DEFAULT_SETTINGS)
+
+    if item_code in settings.get("overrides", {}) and 'min_sales' in settings["overrides"][item_code]:
+        return settings["overrides"][item_code]['min_sales']
+    if supplier in settings.get("defaults", {}) and 'min_sales' in settings["defaults"][supplier]:
+        return settings["defaults"][supplier]['min_sales']
+    return master_defaults.get('min_sales', 0)
+
+def filter_items(df: pd.DataFrame, settings: Dict[str, Dict]) -> Tuple[pd.DataFrame, int, int]:
+    # 제외 키워드가 포함된 품목과 제외 매출수량 미만 품목을 걸러내고, 각각 제외된 개수를 함께 반환합니다.
+    exclude_pattern = '|'.join(EXCLUDE_KEYWORDS)
+    df_filtered = df[~df[COL_ITEM_NAME].astype(str).str.contains(exclude_pattern, na=False)].copy()
+    keyword_excluded_count = len(df) - len(df_filtered)
+    if df_filtered.empty:
+        return df_filtered, keyword_excluded_count, 0
+
+    min_sales_applied = df_filtered.apply(get_min_sales_for_row, axis=1, settings=settings)
+    df_final_filtered = df_filtered[df_filtered[COL_SALES] >= min_sales_applied].copy()
+    sales_excluded_count = len(df_filtered) - len(df_final_filtered)
+    return df_final_filtered, keyword_excluded_count, sales_excluded_count
+
+def calculate_order_quantity(df: pd.DataFrame, settings: Dict[str, Dict], period_days: int) -> pd.DataFrame:
+    results = []
+    master_defaults = settings.get("master_defaults", INITIAL_DEFAULT_SETTINGS)
+    default_settings = settings.get("defaults", {})
+    override_settings = settings.get("overrides", {})
+
+    for row in df.to_dict('records'):
+        item_code = str(row.get(COL_ITEM_CODE, ''))
+        supplier = str(row.get(COL_SUPPLIER, ''))
+        final_settings = {k: v for k, v in {**master_defaults, **default_settings.get(supplier, {}), **override_settings.get(item_code, {})}.items() if k != 'min_sales'}
+
+        lead_time = final_settings.get('lead_time', 0)
+        safety_stock_rate = final_settings.get('safety_stock_rate', 0) / 100
+        addition_rate = final_settings.get('addition_rate', 0) / 100
+        order_unit = final_settings.get('order_unit', 1)
+        if order_unit <= 0: order_unit = 1
+
+        sales_quantity = row.get(COL_SALES, 0)
+        current_stock = row.get(COL_STOCK, 0)
+        row['추천 납품량'] = 0
+        row['초과재고 수량'] = 0
+
+        if period_days > 0:
+            avg_daily_sales = sales_quantity / period_days
+            sales_during_lead_time = avg_daily_sales * lead_time
+            safety_stock = sales_during_lead_time * safety_stock_rate
+            reorder_point = sales_during_lead_time + safety_stock
+            base_order_quantity = reorder_point - current_stock
+
+            if base_order_quantity <= 0:
+                if current_stock > reorder_point * 2 and reorder_point > 0:
+                    row['비고'] = "초과재고"
+                    row['초과재고 수량'] = current_stock - math.ceil(reorder_point)
+                else:
+                    row['비고'] = "재고 충분"
+            else:
+                calculated_quantity = base_order_quantity * (1 + addition_rate)
+                final_order_quantity = math.ceil(calculated_quantity / order_unit) * order_unit
+                row['추천 납품량'] = int(final_order_quantity)
+                if current_stock < final_order_quantity:
+                    row['비고'] = "납품 필요 (긴급)"
+                else:
+                    row['비고'] = "납품 필요"
+
+            row['재고 소진 예상일'] = current_stock / avg_daily_sales if avg_daily_sales > 0 else float('inf')
+        else:
+            row['비고'] = "기간 1일 이상"
+            row['재고 소진 예상일'] = float('inf')
+
+        row['적용된 설정'] = f"L:{lead_time} S:{safety_stock_rate*100:.0f}% A:{addition_rate*100:.0f}% U:{order_unit}"
+        results.append(row)
+    return pd.DataFrame(results)
+
+def build_result_views(result_df: pd.DataFrame) -> Dict[str, pd.DataFrame]:
+    # 계산 결과에서 화면에 필요한 표(납품 추천, 초과재고)만 만듭니다. 전체 결과는 복사하지 않습니다.
+    # 긴급 납품 품목은 항상 납품 추천 품목의 일부이므로 화면에서 order_needed로부터 골라 씁니다.
+    if COL_SPEC in result_df.columns:
+        item_label = result_df[COL_ITEM_NAME].astype(str) + result_df[COL_SPEC].apply(lambda x: f' ({x})' if pd.notna(x) and str(x).strip() != '' else '')
+    else:
+        item_label = result_df[COL_ITEM_NAME]
+
+    order_mask = result_df['추천 납품량'] > 0
+    order_needed_df = result_df[order_mask].copy()
+    order_needed_df[COL_ITEM_LABEL] = item_label[order_mask]
+    if not order_needed_df.empty:
+        order_needed_df.loc[:, '예상 납품 금액'] = order_needed_df['추천 납품량'] * order_needed_df[COL_UNIT_PRICE]
+
+    overstock_mask = result_df['비고'].isin(['초과재고', '악성 초과재고'])
+    overstock_df = result_df[overstock_mask].copy()
+    overstock_df[COL_ITEM_LABEL] = item_label[overstock_mask]
+    if not overstock_df.empty:
+        # 초과재고 비율 계산
+        overstock_df.loc[:, '초과재고 비율 (재고/매출)'] = overstock_df[COL_STOCK] / overstock_df[COL_SALES].replace(0, np.nan)
+        median_ratio = overstock_df['초과재고 비율 (재고/매출)'].median()
+        if pd.notna(median_ratio):
+            malignant_rows_mask = overstock_df['초과재고 비율 (재고/매출)'] >= median_ratio
+            overstock_df.loc[:, '비고'] = np.where(malignant_rows_mask, "악성 초과재고", "초과재고")
+        overstock_df.loc[:, '초과재고 금액'] = overstock_df['초과재고 수량'] * overstock_df[COL_UNIT_PRICE]
+
+    return {'order_needed': order_needed_df, 'overstock': overstock_df}
@@ -0,0 +1,16 @@
+# scm_autoorder/export.py
+from io import BytesIO
+
+import pandas as pd
+
+
+def to_excel_bytes(df: pd.DataFrame, sheet_name: str) -> bytes:
+    # 컬럼 너비를 내용 길이에 맞춘 단일 시트 엑셀 파일을 만듭니다.
+    output = BytesIO()
+    with pd.ExcelWriter(output, engine='xlsxwriter') as writer:
+        df.to_excel(writer, index=False, sheet_name=sheet_name)
+        for column in df:
+            column_length = max(df[column].astype(str).map(len).max(), len(column))
+            col_idx = df.columns.get_loc(column)
+            writer.sheets[sheet_name].set_column(col_idx, col_idx, column_length + 2)
+    return output.getvalue()
@@ -0,0 +1,11 @@
+# scm_autoorder/help/__init__.py
+from functools import lru_cache
+from pathlib import Path
+
+HELP_DIR = Path(__file__).resolve().parent
+
+
+@lru_cache(maxsize=None)
+def load_help_text(name: str) -> str:
+    # 도움말 마크다운은 처음 필요할 때 한 번만 읽고 프로세스 내에서 재사용합니다.
+    return (HELP_DIR / f'{name}.md').read_text(encoding='utf-8')
@@ -0,0 +1,115 @@
+# scm_autoorder/history.py
+import datetime
+import hashlib
+import json
+import os
+import uuid
+from pathlib import Path
+from typing import Dict, Optional, Tuple
+
+import numpy as np
+import pandas as pd
+
+from .constants import (CHANGE_TYPES, COL_ITEM_CODE, COL_ITEM_NAME, COL_UNIT_PRICE, HISTORY_COLUMNS, HISTORY_DIR,
+                        HISTORY_TEXT_COLUMNS, STATUS_MISSING)
+
+
+def compute_settings_hash(settings_json: str) -> str:
+    return hashlib.sha256(settings_json.encode('utf-8')).hexdigest()
+
+RUN_INDEX_COLUMNS = ['run_id', 'created_at', 'start_date', 'end_date', 'period_days',
+                     'input_hash', 'settings_hash', 'item_count']
+
+def list_run_ids() -> Tuple[str, ...]:
+    # 메타데이터를 읽지 않고 파일 이름만 확인하므로, 새 실행이 저장되었는지 저렴하게 알 수 있습니다. (목록 캐시 키로 사용)
+    return tuple(sorted(meta_path.name[len('run_'):-len('.json')] for meta_path in HISTORY_DIR.glob('run_*.json')))
+
+def load_run_index(run_ids: Optional[Tuple[str, ...]] = None) -> pd.DataFrame:
+    # 공유 인덱스 파일 없이 실행별 메타데이터 파일(run_*.json)을 모아 실행 목록을 만듭니다.
+    records = []
+    for run_id in (list_run_ids() if run_ids is None else run_ids):
+        try:
+            records.append(json.loads((HISTORY_DIR / f'run_{run_id}.json').read_text(encoding='utf-8')))
+        except (OSError, ValueError):
+            continue
+    run_index = pd.DataFrame(records, columns=RUN_INDEX_COLUMNS)
+    run_index['created_at'] = pd.to_datetime(run_index['created_at'])
+    return run_index
+
+def save_run(result_df: pd.DataFrame, settings: Dict[str, Dict], input_hash: str,
+             start_date: datetime.date, end_date: datetime.date, period_days: int) -> str:
+    HISTORY_DIR.mkdir(parents=True, exist_ok=True)
+    created_at = datetime.datetime.now()
+    run_id = f"{created_at.strftime('%Y%m%d_%H%M%S_%f')}_{uuid.uuid4().hex[:6]}"
+
+    # 비교에 필요한 컬럼만 저장하고, 텍스트 컬럼은 문자열로 통일해 parquet 스키마를 고정합니다.
+    snapshot = result_df[[col for col in HISTORY_COLUMNS if col in result_df.columns]].copy()
+    for col in HISTORY_TEXT_COLUMNS:
+        if col in snapshot.columns:
+            snapshot[col] = snapshot[col].astype('string')
+    snapshot['비고'] = snapshot['비고'].astype('category')
+    snapshot.to_parquet(HISTORY_DIR / f'run_{run_id}.parquet', index=False)
+
+    settings_json = json.dumps(settings, ensure_ascii=False, sort_keys=True)
+    settings_hash = compute_settings_hash(settings_json)
+    # 설정 스냅샷은 크기가 크므로(개별 품목 설정 수천 개) 해시별 파일에 한 번만 저장하고, 메타데이터에는 해시만 남깁니다.
+    settings_path = HISTORY_DIR / f'settings_{settings_hash}.json'
+    if not settings_path.exists():
+        write_atomic(settings_path, settings_json, run_id)
+
+    metadata = {
+        'run_id': run_id, 'created_at': created_at.isoformat(),
+        'start_date': start_date.isoformat(), 'end_date': end_date.isoformat(), 'period_days': period_days,
+        'input_hash': input_hash, 'settings_hash': settings_hash, 'item_count': len(snapshot)
+    }
+    # 실행마다 자기 메타데이터 파일만 쓰므로 동시 세션끼리 덮어쓸 공유 파일이 없습니다.
+    # 결과 파일을 먼저 쓰고 메타데이터는 임시 파일에서 교체하여, 목록에는 저장이 끝난 실행만 나타납니다.
+    write_atomic(HISTORY_DIR / f'run_{run_id}.json', json.dumps(metadata, ensure_ascii=False), run_id)
+    return run_id
+
+def write_atomic(path: Path, text: str, run_id: str) -> None:
+    # 임시 파일 이름에 run_id를 붙여 동시에 같은 파일을 쓰는 실행끼리도 임시 파일이 겹치지 않게 합니다.
+    tmp_path = path.with_name(f'{path.name}.{run_id}.tmp')
+    tmp_path.write_text(text, encoding='utf-8')
+    os.replace(tmp_path, path)
+
+def load_settings_snapshot(settings_hash: str) -> Dict[str, Dict]:
+    return json.loads((HISTORY_DIR / f'settings_{settings_hash}.json').read_text(encoding='utf-8'))
+
+def load_run(run_id: str) -> pd.DataFrame:
+    return pd.read_parquet(HISTORY_DIR / f'run_{run_id}.parquet')
+
+def diff_runs(prev_df: pd.DataFrame, curr_df: pd.DataFrame) -> pd.DataFrame:
+    value_cols = [COL_ITEM_CODE, COL_ITEM_NAME, COL_UNIT_PRICE, '추천 납품량', '비고']
+    merged = pd.merge(prev_df[value_cols], curr_df[value_cols], on=COL_ITEM_CODE, how='outer', suffixes=('_prev', '_curr'))
+
+    prev_qty = merged['추천 납품량_prev'].fillna(0).to_numpy()
+    curr_qty = merged['추천 납품량_curr'].fillna(0).to_numpy()
+    prev_cost = prev_qty * merged[f'{COL_UNIT_PRICE}_prev'].fillna(0).to_numpy()
+    curr_cost = curr_qty * merged[f'{COL_UNIT_PRICE}_curr'].fillna(0).to_numpy()
+    prev_status = merged['비고_prev'].astype(object).fillna(STATUS_MISSING).to_numpy()
+    curr_status = merged['비고_curr'].astype(object).fillna(STATUS_MISSING).to_numpy()
+
+    change_type = np.select(
+        [(prev_qty <= 0) & (curr_qty > 0), (prev_qty > 0) & (curr_qty <= 0), prev_qty != curr_qty, prev_status != curr_status],
+        CHANGE_TYPES,
+        default=''
+    )
+    diff_df = pd.DataFrame({
+        COL_ITEM_CODE: merged[COL_ITEM_CODE].to_numpy(),
+        COL_ITEM_NAME: merged[f'{COL_ITEM_NAME}_curr'].fillna(merged[f'{COL_ITEM_NAME}_prev']).to_numpy(),
+        '변경 구분': change_type,
+        '이전 납품량': prev_qty,
+        '현재 납품량': curr_qty,
+        '납품량 변화': curr_qty - prev_qty,
+        '이전 비고': prev_status,
+        '현재 비고': curr_status,
+        '금액 변화': curr_cost - prev_cost,
+    })
+    diff_df = diff_df[change_type != '']
+    order = np.argsort(-np.abs(diff_df['금액 변화'].to_numpy()), kind='stable')
+    return diff_df.iloc[order].reset_index(drop=True)
+
+def format_run_label(run: pd.Series) -> str:
+    created_at = pd.Timestamp(run['created_at']).strftime('%Y-%m-%d %H:%M:%S')
+    return f"{created_at} | {run['start_date']} ~ {run['end_date']} | 파일 {run['input_hash'][:8]} | 설정 {run['settings_hash'][:8]}"
@@ -0,0 +1,37 @@
+# scm_autoorder/ingest.py
+import hashlib
+from pathlib import Path
+from typing import List, Optional
+
+import pandas as pd
+
+from .constants import COL_SUPPLIER, NUMERIC_COLUMNS, REQUIRED_COLUMNS
+
+
+def find_latest_file(directory: Path, pattern: str) -> Optional[Path]:
+    try:
+        files = list(directory.glob(pattern))
+        if not files: return None
+        return max(files, key=lambda p: p.stat().st_mtime)
+    except Exception: return None
+
+def compute_input_hash(source) -> str:
+    # 자동 검색된 파일(Path)과 업로드 파일(UploadedFile) 모두 원본 바이트 기준으로 해시합니다.
+    data = source.read_bytes() if isinstance(source, Path) else source.getvalue()
+    return hashlib.sha256(data).hexdigest()
+
+def read_sales_file(source) -> pd.DataFrame:
+    # 현황 엑셀 파일을 읽고 수치 컬럼(단가, 매출수량, 현재고)을 정수로 정리합니다.
+    df = pd.read_excel(source)
+    for col in NUMERIC_COLUMNS:
+        if col in df.columns:
+            df[col] = pd.to_numeric(df[col], errors='coerce').fillna(0).astype('int64')
+    return df
+
+def missing_required_columns(df: pd.DataFrame) -> List[str]:
+    return [col for col in REQUIRED_COLUMNS if col not in df.columns]
+
+def list_suppliers(df: pd.DataFrame) -> List[str]:
+    if COL_SUPPLIER not in df.columns:
+        return []
+    return sorted([str(s) for s in df[COL_SUPPLIER].unique() if str(s) != 'nan'])
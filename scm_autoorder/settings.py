@@ -0,0 +1,62 @@
+# scm_autoorder/settings.py
+import json
+import os
+from typing import Dict, List, Optional, Tuple
+
+import pandas as pd
+
+from .constants import INITIAL_DEFAULT_SETTINGS, SETTINGS_FILE
+
+
+def default_settings() -> Dict[str, Dict]:
+    return {"master_defaults": INITIAL_DEFAULT_SETTINGS.copy(), "defaults": {}, "overrides": {}}
+
+def load_settings() -> Dict[str, Dict]:
+    # 이 함수는 session_state 초기화 로직 변경으로 인해 직접 호출되지는 않게 됩니다.
+    if os.path.exists(SETTINGS_FILE):
+        with open(SETTINGS_FILE, 'r', encoding='utf-8') as f:
+            settings = json.load(f)
+            if "master_defaults" not in settings:
+                settings["master_defaults"] = INITIAL_DEFAULT_SETTINGS.copy()
+            else:
+                if "min_sales" not in settings["master_defaults"]:
+                     settings["master_defaults"]['min_sales'] = INITIAL_DEFAULT_SETTINGS['min_sales']
+
+            for sup_settings in settings.get("defaults", {}).values():
+                sup_settings.setdefault('min_sales', settings["master_defaults"]['min_sales'])
+            for item_settings in settings.get("overrides", {}).values():
+                item_settings.setdefault('min_sales', INITIAL_DEFAULT_SETTINGS['min_sales'])
+            return settings
+    return default_settings()
+
+def save_settings(settings: Dict[str, Dict]):
+    # Streamlit 클라우드 환경의 읽기 전용 파일 시스템 문제로 이 함수는 호출되지 않도록 수정합니다.
+    with open(SETTINGS_FILE, 'w', encoding='utf-8') as f:
+        json.dump(settings, f, ensure_ascii=False, indent=4)
+
+def parse_settings_df(settings_df: pd.DataFrame) -> Tuple[Optional[Dict], List[Dict], Dict[str, Dict]]:
+    # 매입처 제공 설정값 파일을 (마스터 설정, 개별 품목 설정 원본 행, 상품코드별 overrides)로 변환합니다.
+    master_settings = None
+    master_row = settings_df[settings_df['설정구분'] == '매입처별 기본값']
+    if not master_row.empty:
+        master_data = master_row.iloc[0]
+        master_settings = {
+            'lead_time': int(master_data.get('리드타임(재발주기간)(일)', 15)),
+            'safety_stock_rate': int(master_data.get('안전재고율(%)', 10)),
+            'addition_rate': int(master_data.get('가산율(%)', 0)),
+            'order_unit': int(master_data.get('발주단위', 5)),
+            'min_sales': int(master_data.get('제외매출수량', 0))
+        }
+
+    individual_settings = settings_df[settings_df['설정구분'] == '개별 품목 설정'].to_dict('records')
+    overrides = {}
+    for setting in individual_settings:
+        item_code = str(setting.get('상품코드', ''))
+        overrides[item_code] = {
+            'lead_time': int(setting.get('리드타임(재발주기간)(일)', 0)),
+            'safety_stock_rate': int(setting.get('안전재고율(%)', 0)),
+            'addition_rate': int(setting.get('가산율(%)', 0)),
+            'order_unit': int(setting.get('발주단위', 1)),
+            'min_sales': int(setting.get('제외매출수량', 0))
+        }
+    return master_settings, individual_settings, overrides
@@ -0,0 +1,6 @@
+# tests/conftest.py
+import sys
+from pathlib import Path
+
+# 저장소 루트의 scm_autoorder 패키지를 설치 없이 import 할 수 있도록 합니다.
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
@@ -0,0 +1,52 @@
+# tests/test_app.py
+import datetime
+from pathlib import Path
+
+import pandas as pd
+from streamlit.testing.v1 import AppTest
+
+from scm_autoorder import history
+from scm_autoorder.constants import DIFF_DISPLAY_MAX_ROWS
+from scm_autoorder.help import load_help_text
+
+APP_SCRIPT = Path(__file__).resolve().parent.parent / 'SCM_AutoOrder1.0.py'
+
+
+def make_large_run(num_items, order_qty):
+    return pd.DataFrame({
+        '상품코드': [str(100000000 + i) for i in range(num_items)],
+        '상품명': [f'상품{i}' for i in range(num_items)],
+        '현구매단가': 1000,
+        '추천 납품량': [order_qty + i % 7 for i in range(num_items)],
+        '비고': '납품 필요',
+    })
+
+
+def test_large_run_diff_renders(tmp_path, monkeypatch):
+    # 변경 품목 30,000개 x 9개 컬럼 = 270,000셀로, pandas Styler의 기본 셀 수 제한(262,144)을 넘는 비교 결과입니다.
+    monkeypatch.setattr(history, 'HISTORY_DIR', tmp_path / 'run_history')
+    monkeypatch.setenv('HOME', str(tmp_path))
+    today = datetime.date(2026, 1, 31)
+    history.save_run(make_large_run(30000, 10), {}, 'hash1', today, today, 1)
+    history.save_run(make_large_run(30000, 20), {}, 'hash2', today, today, 1)
+
+    at = AppTest.from_file(str(APP_SCRIPT), default_timeout=120)
+    at.run()
+
+    assert not at.exception
+    assert len(at.dataframe) == 1
+    assert len(at.dataframe[0].value) == DIFF_DISPLAY_MAX_ROWS
+    assert at.metric[2].value == '30000 개'
+
+
+def test_help_text_rendered_only_when_toggled(tmp_path, monkeypatch):
+    monkeypatch.setattr(history, 'HISTORY_DIR', tmp_path / 'run_history')
+    monkeypatch.setenv('HOME', str(tmp_path))
+    system_guide = load_help_text('system_guide').strip()
+
+    at = AppTest.from_file(str(APP_SCRIPT), default_timeout=30)
+    at.run()
+    assert system_guide not in [markdown.value.strip() for markdown in at.markdown]
+
+    next(toggle for toggle in at.toggle if toggle.label == "📖 시스템 설명").set_value(True).run()
+    assert system_guide in [markdown.value.strip() for markdown in at.markdown]
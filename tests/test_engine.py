@@ -0,0 +1,141 @@
+# tests/test_engine.py
+import math
+
+import pandas as pd
+
+from scm_autoorder.engine import build_result_views, calculate_order_quantity, filter_items
+from scm_autoorder.settings import default_settings, parse_settings_df
+
+
+def make_sales(rows):
+    return pd.DataFrame(rows, columns=['상품코드', '상품명', '규격', '매입처', '매출수량', '현재고', '현구매단가'])
+
+def make_settings(master=None, overrides=None):
+    settings = default_settings()
+    settings["master_defaults"].update(master or {})
+    settings["overrides"] = overrides or {}
+    return settings
+
+
+# --- filter_items ---
+def test_filter_items_excludes_keywords_and_low_sales():
+    df = make_sales([
+        [1, '일반상품', '', 'S', 10, 0, 100],
+        [2, '배송비', '', 'S', 100, 0, 100],
+        [3, '할인 쿠폰', '', 'S', 100, 0, 100],
+        [4, '저판매상품', '', 'S', 2, 0, 100],
+    ])
+    filtered, keyword_excluded, sales_excluded = filter_items(df, make_settings({'min_sales': 5}))
+    assert list(filtered['상품코드']) == [1]
+    assert keyword_excluded == 2
+    assert sales_excluded == 1
+
+def test_filter_items_uses_item_override_min_sales():
+    df = make_sales([[1, 'A', '', 'S', 3, 0, 100], [2, 'B', '', 'S', 3, 0, 100]])
+    settings = make_settings({'min_sales': 5}, {'2': {'min_sales': 0}})
+    filtered, _, sales_excluded = filter_items(df, settings)
+    assert list(filtered['상품코드']) == [2]
+    assert sales_excluded == 1
+
+def test_filter_items_all_excluded_by_keyword():
+    df = make_sales([[1, '배송비', '', 'S', 10, 0, 100]])
+    filtered, keyword_excluded, sales_excluded = filter_items(df, make_settings())
+    assert filtered.empty
+    assert (keyword_excluded, sales_excluded) == (1, 0)
+
+
+# --- calculate_order_quantity ---
+def test_calculate_matches_documented_example():
+    # 도움말의 계산 예시: 매출 600개(30일), 현재고 80개, 리드타임 15일, 안전재고율 10%, 가산율 5%, 납품단위 10개 → 270개
+    # 현재고(80) < 최종 추천 납품량(270) 이므로 긴급으로 분류됩니다.
+    df = make_sales([[1, 'A', '', 'S', 600, 80, 1000]])
+    settings = make_settings({'lead_time': 15, 'safety_stock_rate': 10, 'addition_rate': 5, 'order_unit': 10})
+    row = calculate_order_quantity(df, settings, 30).iloc[0]
+    assert row['추천 납품량'] == 270
+    assert row['비고'] == '납품 필요 (긴급)'
+    assert row['재고 소진 예상일'] == 4
+    assert row['적용된 설정'] == 'L:15 S:10% A:5% U:10'
+
+def test_calculate_marks_non_urgent_when_stock_covers_order():
+    # 리드타임 15일, 안전재고율 10%: 재주문점 = 10 × 15 × 1.1 = 165, 기본 납품량 = 165 - 100 = 65 → 65개(5개 단위)
+    df = make_sales([[1, 'A', '', 'S', 300, 100, 100]])
+    row = calculate_order_quantity(df, make_settings(), 30).iloc[0]
+    assert row['추천 납품량'] == 65
+    assert row['비고'] == '납품 필요'
+
+def test_calculate_overstock_and_sufficient_stock():
+    df = make_sales([[1, 'A', '', 'S', 30, 800, 100], [2, 'B', '', 'S', 30, 20, 100]])
+    result = calculate_order_quantity(df, make_settings({'lead_time': 15, 'safety_stock_rate': 10}), 30)
+    overstock, sufficient = result.iloc[0], result.iloc[1]
+    assert overstock['비고'] == '초과재고'
+    assert overstock['초과재고 수량'] == 800 - math.ceil(16.5)
+    assert sufficient['비고'] == '재고 충분'
+    assert sufficient['추천 납품량'] == 0
+
+def test_calculate_item_override_takes_priority():
+    df = make_sales([[1, 'A', '', 'S', 300, 0, 100], [2, 'B', '', 'S', 300, 0, 100]])
+    settings = make_settings({'lead_time': 15}, {'2': {'lead_time': 30, 'order_unit': 1}})
+    result = calculate_order_quantity(df, settings, 30)
+    assert list(result['적용된 설정']) == ['L:15 S:10% A:0% U:5', 'L:30 S:10% A:0% U:1']
+    assert list(result['추천 납품량']) == [165, 330]
+
+def test_calculate_without_period():
+    df = make_sales([[1, 'A', '', 'S', 300, 0, 100]])
+    row = calculate_order_quantity(df, make_settings(), 0).iloc[0]
+    assert row['비고'] == '기간 1일 이상'
+    assert row['추천 납품량'] == 0
+
+
+# --- build_result_views ---
+def test_build_result_views_splits_order_and_overstock():
+    df = make_sales([
+        [1, 'A', '1kg', 'S', 300, 10, 100],
+        [2, 'B', '', 'S', 30, 800, 50],
+        [3, 'C', None, 'S', 10, 900, 20],
+        [4, 'D', '', 'S', 30, 20, 100],
+    ])
+    views = build_result_views(calculate_order_quantity(df, make_settings(), 30))
+    assert set(views) == {'order_needed', 'overstock'}
+
+    order_needed = views['order_needed']
+    assert list(order_needed['상품코드']) == [1]
+    assert order_needed.iloc[0]['상품명 (규격)'] == 'A (1kg)'
+    assert order_needed.iloc[0]['예상 납품 금액'] == 155 * 100
+
+    overstock = views['overstock'].set_index('상품코드')
+    assert list(overstock.index) == [2, 3]
+    assert overstock.loc[2, '상품명 (규격)'] == 'B'
+    assert overstock.loc[3, '상품명 (규격)'] == 'C'
+    # 초과재고 비율(재고/매출)의 중간값 이상은 악성 초과재고로 분류됩니다.
+    assert overstock.loc[3, '비고'] == '악성 초과재고'
+    assert overstock.loc[2, '초과재고 금액'] == overstock.loc[2, '초과재고 수량'] * 50
+
+def test_build_result_views_does_not_modify_result():
+    result = calculate_order_quantity(make_sales([[1, 'A', '', 'S', 300, 10, 100]]), make_settings(), 30)
+    before = result.copy()
+    build_result_views(result)
+    pd.testing.assert_frame_equal(result, before)
+
+
+# --- parse_settings_df ---
+def test_parse_settings_df_reads_master_and_item_settings():
+    settings_df = pd.DataFrame([
+        {'설정구분': '매입처별 기본값', '상품코드': '', '리드타임(재발주기간)(일)': 7, '안전재고율(%)': 20,
+         '가산율(%)': 5, '발주단위': 10, '제외매출수량': 3},
+        {'설정구분': '개별 품목 설정', '상품코드': 103224048, '리드타임(재발주기간)(일)': 14, '안전재고율(%)': 0,
+         '가산율(%)': 0, '발주단위': 2, '제외매출수량': 0},
+    ])
+    master, individual, overrides = parse_settings_df(settings_df)
+    assert master == {'lead_time': 7, 'safety_stock_rate': 20, 'addition_rate': 5, 'order_unit': 10, 'min_sales': 3}
+    assert len(individual) == 1
+    assert overrides == {'103224048': {'lead_time': 14, 'safety_stock_rate': 0, 'addition_rate': 0,
+                                       'order_unit': 2, 'min_sales': 0}}
+
+def test_parse_settings_df_without_master_row():
+    settings_df = pd.DataFrame([
+        {'설정구분': '개별 품목 설정', '상품코드': 'A1', '리드타임(재발주기간)(일)': 14, '안전재고율(%)': 0,
+         '가산율(%)': 0, '발주단위': 2, '제외매출수량': 0},
+    ])
+    master, _, overrides = parse_settings_df(settings_df)
+    assert master is None
+    assert list(overrides) == ['A1']
@@ -0,0 +1,113 @@
+# tests/test_history.py
+import datetime
+
+import pandas as pd
+
+from scm_autoorder import history
+from scm_autoorder.constants import STATUS_MISSING
+
+
+def make_run(rows):
+    return pd.DataFrame(rows, columns=['상품코드', '상품명', '현구매단가', '추천 납품량', '비고'])
+
+def diff_row(diff_df, item_code):
+    rows = diff_df[diff_df['상품코드'] == item_code]
+    assert len(rows) == 1
+    return rows.iloc[0]
+
+
+def test_new_order_line():
+    prev = make_run([['A', '상품A', 100, 0, '재고 충분']])
+    curr = make_run([['A', '상품A', 100, 10, '납품 필요 (긴급)']])
+    row = diff_row(history.diff_runs(prev, curr), 'A')
+    assert row['변경 구분'] == '신규 납품'
+    assert row['납품량 변화'] == 10
+    assert row['이전 비고'] == '재고 충분'
+    assert row['현재 비고'] == '납품 필요 (긴급)'
+
+def test_removed_order_line():
+    prev = make_run([['A', '상품A', 100, 10, '납품 필요']])
+    curr = make_run([['A', '상품A', 100, 0, '재고 충분']])
+    row = diff_row(history.diff_runs(prev, curr), 'A')
+    assert row['변경 구분'] == '납품 제외'
+    assert row['납품량 변화'] == -10
+
+def test_quantity_change():
+    prev = make_run([['A', '상품A', 100, 10, '납품 필요']])
+    curr = make_run([['A', '상품A', 100, 15, '납품 필요']])
+    row = diff_row(history.diff_runs(prev, curr), 'A')
+    assert row['변경 구분'] == '수량 변경'
+    assert row['납품량 변화'] == 5
+
+def test_status_only_change():
+    prev = make_run([['A', '상품A', 100, 0, '재고 충분']])
+    curr = make_run([['A', '상품A', 100, 0, '초과재고']])
+    row = diff_row(history.diff_runs(prev, curr), 'A')
+    assert row['변경 구분'] == '상태 변경'
+    assert row['납품량 변화'] == 0
+    assert row['금액 변화'] == 0
+
+def test_unchanged_items_are_omitted():
+    prev = make_run([['A', '상품A', 100, 10, '납품 필요'], ['B', '상품B', 100, 0, '재고 충분']])
+    curr = make_run([['A', '상품A', 100, 10, '납품 필요'], ['B', '상품B', 100, 0, '재고 충분']])
+    assert history.diff_runs(prev, curr).empty
+
+def test_items_present_in_only_one_run():
+    prev = make_run([['OLD', '이전상품', 100, 5, '납품 필요'], ['GONE', '사라진상품', 100, 0, '재고 충분']])
+    curr = make_run([['NEW', '신규상품', 200, 3, '납품 필요 (긴급)']])
+    diff_df = history.diff_runs(prev, curr)
+
+    old_row = diff_row(diff_df, 'OLD')
+    assert old_row['변경 구분'] == '납품 제외'
+    assert old_row['상품명'] == '이전상품'
+    assert old_row['현재 비고'] == STATUS_MISSING
+
+    new_row = diff_row(diff_df, 'NEW')
+    assert new_row['변경 구분'] == '신규 납품'
+    assert new_row['이전 납품량'] == 0
+    assert new_row['이전 비고'] == STATUS_MISSING
+
+    gone_row = diff_row(diff_df, 'GONE')
+    assert gone_row['변경 구분'] == '상태 변경'
+    assert gone_row['현재 비고'] == STATUS_MISSING
+
+def test_cost_delta_uses_each_runs_unit_price():
+    prev = make_run([['A', '상품A', 100, 10, '납품 필요'], ['B', '상품B', 50, 4, '납품 필요']])
+    curr = make_run([['A', '상품A', 120, 20, '납품 필요'], ['B', '상품B', 50, 0, '재고 충분']])
+    diff_df = history.diff_runs(prev, curr)
+    assert diff_row(diff_df, 'A')['금액 변화'] == 20 * 120 - 10 * 100
+    assert diff_row(diff_df, 'B')['금액 변화'] == -4 * 50
+    # 금액 변화의 절댓값이 큰 순서로 정렬됩니다.
+    assert list(diff_df['상품코드']) == ['A', 'B']
+
+def test_categorical_status_columns_with_different_categories():
+    # 저장된 실행의 비고 컬럼은 category 타입이며, 실행마다 카테고리 구성이 다를 수 있습니다.
+    prev = make_run([['A', '상품A', 100, 0, '재고 충분']]).astype({'비고': 'category'})
+    curr = make_run([['A', '상품A', 100, 0, '초과재고']]).astype({'비고': 'category'})
+    assert diff_row(history.diff_runs(prev, curr), 'A')['변경 구분'] == '상태 변경'
+
+def test_saved_runs_round_trip(tmp_path, monkeypatch):
+    monkeypatch.setattr(history, 'HISTORY_DIR', tmp_path)
+    today = datetime.date(2026, 1, 31)
+    prev_id = history.save_run(make_run([['A', '상품A', 100, 10, '납품 필요']]), {}, 'hash1', today, today, 1)
+    curr_id = history.save_run(make_run([['A', '상품A', 100, 0, '재고 충분']]), {}, 'hash2', today, today, 1)
+
+    run_index = history.load_run_index()
+    assert set(run_index['run_id']) == {prev_id, curr_id}
+    diff_df = history.diff_runs(history.load_run(prev_id), history.load_run(curr_id))
+    assert diff_row(diff_df, 'A')['변경 구분'] == '납품 제외'
+
+def test_settings_snapshot_kept_out_of_run_index(tmp_path, monkeypatch):
+    monkeypatch.setattr(history, 'HISTORY_DIR', tmp_path)
+    today = datetime.date(2026, 1, 31)
+    settings = {'master_defaults': {'lead_time': 7}, 'overrides': {str(code): {'lead_time': 3} for code in range(2000)}}
+    first_id = history.save_run(make_run([['A', '상품A', 100, 10, '납품 필요']]), settings, 'hash1', today, today, 1)
+    second_id = history.save_run(make_run([['A', '상품A', 100, 5, '납품 필요']]), settings, 'hash1', today, today, 1)
+
+    # 실행 목록에는 설정 해시만 있고, 같은 설정의 스냅샷 파일은 하나만 저장됩니다.
+    assert history.list_run_ids() == tuple(sorted([first_id, second_id]))
+    run_index = history.load_run_index()
+    assert 'settings_json' not in run_index.columns
+    assert run_index['settings_hash'].nunique() == 1
+    assert len(list(tmp_path.glob('settings_*.json'))) == 1
+    assert history.load_settings_snapshot(run_index['settings_hash'].iloc[0]) == settings